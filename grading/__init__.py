@@ -18,6 +18,7 @@ from .penalty import (
 
 from .taskid import (
     extract_taskid_from_logs,
+    extract_taskid_from_lines,
     calculate_expected_taskid,
     validate_taskid,
     TaskIdResult,
@@ -43,6 +44,8 @@ from .github_client import (
 
 from .sheets_client import (
     find_student_row,
+    build_github_index,
+    find_student_row_indexed,
     find_lab_column_by_name,
     calculate_lab_column,
     can_overwrite_cell,
@@ -53,6 +56,8 @@ from .sheets_client import (
     StudentLocation,
     LabColumn,
     GradeUpdate,
+    SheetSnapshot,
+    fetch_sheet_snapshot,
 )
 
 from .grader import (
@@ -75,6 +80,7 @@ __all__ = [
     "PenaltyStrategy",
     # taskid
     "extract_taskid_from_logs",
+    "extract_taskid_from_lines",
     "calculate_expected_taskid",
     "validate_taskid",
     "TaskIdResult",
@@ -94,6 +100,8 @@ __all__ = [
     "get_default_forbidden_patterns",
     # sheets_client
     "find_student_row",
+    "build_github_index",
+    "find_student_row_indexed",
     "find_lab_column_by_name",
     "calculate_lab_column",
     "can_overwrite_cell",
@@ -104,6 +112,8 @@ __all__ = [
     "StudentLocation",
     "LabColumn",
     "GradeUpdate",
+    "SheetSnapshot",
+    "fetch_sheet_snapshot",
     # grader
     "LabGrader",
     "GradeResult",
@@ -4,31 +4,51 @@ CI (Continuous Integration) result checking for lab submissions.
 This module contains functions for filtering and evaluating GitHub Actions
 check runs to determine if a lab submission passes all required tests.
 """
+import re
+import sys
 from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Any
 
 
 # Default job names to check if none specified in config
-DEFAULT_JOB_NAMES = [
+DEFAULT_JOB_NAMES = frozenset({
     "run-autograding-tests",
     "test",
     "build",
     "Autograding",
     "autograding",
-]
+})
 
+# Summary emoji per check run conclusion; any other conclusion counts as pending
+_CONCLUSION_EMOJI = {"success": "✅", "failure": "❌"}
+_PENDING_EMOJI = "⏳"
 
-@dataclass
+# datetime.fromisoformat() parses a trailing "Z" natively since Python 3.11,
+# so the "Z" -> "+00:00" rewrite is only needed on older interpreters.
+_FROMISOFORMAT_ACCEPTS_Z = sys.version_info >= (3, 11)
+
+# Job ID at the end of a check run URL: ".../actions/runs/1/job/12345[?pr=2]"
+_JOB_ID_RE = re.compile(r"/job/(\d+)(?:\?|$)")
+
+
+@dataclass(slots=True)
 class CheckRun:
     """Represents a single CI check run."""
     name: str
     conclusion: str | None  # "success", "failure", None (pending/running)
     html_url: str
     completed_at: datetime | None = None
+    job_id: int | None = None  # Parsed from html_url if not given
+
+    def __post_init__(self):
+        if self.job_id is None:
+            match = _JOB_ID_RE.search(self.html_url)
+            if match:
+                self.job_id = int(match.group(1))
 
 
-@dataclass
+@dataclass(slots=True)
 class CIResult:
     """Aggregated result of CI checks."""
     passed: bool
@@ -37,6 +57,7 @@ class CIResult:
     summary: list[str] = field(default_factory=list)
     latest_success_time: datetime | None = None
     has_pending: bool = False
+    successful_runs: list[CheckRun] = field(default_factory=list)  # In input order
 
 
 def parse_check_runs(check_runs_data: list[dict[str, Any]]) -> list[CheckRun]:
@@ -55,8 +76,10 @@ def parse_check_runs(check_runs_data: list[dict[str, Any]]) -> list[CheckRun]:
         completed_str = run.get("completed_at")
         if completed_str:
             try:
-                completed_at = datetime.fromisoformat(completed_str.replace("Z", "+00:00"))
-            except (ValueError, TypeError):
+                if not _FROMISOFORMAT_ACCEPTS_Z:
+                    completed_str = completed_str.replace("Z", "+00:00")
+                completed_at = datetime.fromisoformat(completed_str)
+            except (ValueError, TypeError, AttributeError):
                 pass
 
         result.append(CheckRun(
@@ -92,8 +115,9 @@ def filter_relevant_jobs(
         [CheckRun(name='test', ...)]
     """
     if configured_jobs is not None:
-        # Filter by explicitly configured jobs
-        return [run for run in check_runs if run.name in configured_jobs]
+        # Filter by explicitly configured jobs (set for O(1) membership)
+        jobs_set = frozenset(configured_jobs)
+        return [run for run in check_runs if run.name in jobs_set]
 
     # Try to find default jobs
     default_matches = [run for run in check_runs if run.name in DEFAULT_JOB_NAMES]
@@ -136,25 +160,25 @@ def evaluate_ci_results(check_runs: list[CheckRun]) -> CIResult:
         )
 
     summary = []
-    passed_count = 0
+    successful_runs = []
     latest_success: datetime | None = None
     has_pending = False
 
     for run in check_runs:
-        if run.conclusion == "success":
-            emoji = "✅"
-            passed_count += 1
-            if run.completed_at:
-                if latest_success is None or run.completed_at > latest_success:
-                    latest_success = run.completed_at
-        elif run.conclusion == "failure":
-            emoji = "❌"
-        else:
-            emoji = "⏳"
+        conclusion = run.conclusion
+        if conclusion == "success":
+            successful_runs.append(run)
+            completed_at = run.completed_at
+            if completed_at:
+                if latest_success is None or completed_at > latest_success:
+                    latest_success = completed_at
+        elif conclusion != "failure":
             has_pending = True
 
+        emoji = _CONCLUSION_EMOJI.get(conclusion, _PENDING_EMOJI)
         summary.append(f"{emoji} {run.name} — {run.html_url}")
 
+    passed_count = len(successful_runs)
     return CIResult(
         passed=(passed_count == len(check_runs) and not has_pending),
         passed_count=passed_count,
@@ -162,6 +186,7 @@ def evaluate_ci_results(check_runs: list[CheckRun]) -> CIResult:
         summary=summary,
         latest_success_time=latest_success,
         has_pending=has_pending,
+        successful_runs=successful_runs,
     )
 
 
@@ -4,16 +4,38 @@ GitHub API client for lab grading.
 This module provides a client for interacting with GitHub API
 to check repositories, commits, and CI status.
 """
+import time
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, Callable, Iterator
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# GET responses shared by all clients: a GitHubClient is created per grading
+# request, so a per-instance cache would rarely be hit twice.
+# Key: (token, url, params) -> (expires_at, etag, parsed JSON body)
+_RESPONSE_CACHE: dict[tuple[str, str, tuple], tuple[float, str | None, Any]] = {}
+_RESPONSE_CACHE_MAX_ENTRIES = 1024
+
+
+# File statuses that count as tampering with a forbidden file
+_FORBIDDEN_STATUSES = frozenset({"removed", "modified"})
+
+# Forbidden by default when the lab ships test_main.py
+_TEST_FORBIDDEN_PATTERNS = ("test_main.py", "tests/")
+
+
+def clear_cache() -> None:
+    """Drop all cached GitHub API responses."""
+    _RESPONSE_CACHE.clear()
 
 
 @dataclass
 class CommitInfo:
     """Information about a commit."""
     sha: str
-    files: list[dict[str, Any]]  # List of {filename, status, ...}
+    files: list[dict[str, Any]]  # List of {filename, status}
 
 
 @dataclass
@@ -34,13 +56,27 @@ class GitHubClient:
     """Client for GitHub API operations."""
 
     BASE_URL = "https://api.github.com"
-
-    def __init__(self, token: str):
+    USER_AGENT = "lab-grader-web"
+    MAX_PARALLEL_REQUESTS = 8  # Upper bound for concurrent calls fanned out by one method
+    CHECK_RUNS_PER_PAGE = 100  # GitHub maximum
+    RATE_LIMIT_RETRIES = 3
+    MAX_RATE_LIMIT_WAIT = 5  # Seconds in total per call; requests run in the endpoint threadpool
+
+    # Response cache TTLs in seconds (see _get_json); after expiry entries are
+    # still revalidated by ETag rather than downloaded again
+    USER_TTL = 300  # Accounts are not renamed mid-semester
+    LATEST_COMMIT_TTL = 5  # One grading run looks up the latest commit several times
+    COMMIT_DETAIL_TTL = 3600  # Addressed by SHA, so the content never changes
+    CHECK_RUNS_TTL = 10  # Short: pending runs must be re-polled soon
+
+    def __init__(self, token: str, session: requests.Session | None = None):
         """
         Initialize GitHub client.
 
         Args:
             token: GitHub personal access token or app token
+            session: Shared session from create_session() (None = create
+                one owned by this client)
         """
         self.token = token
         self.headers = {
@@ -48,6 +84,180 @@ class GitHubClient:
             "Accept": "application/vnd.github+json"
         }
 
+        # Auth headers are sent per request (see _request), so one session
+        # can be shared between clients created for different requests.
+        self._owns_session = session is None
+        self.session = session if session is not None else self.create_session()
+
+        # HEAD tree paths per (org, repo), fetched at most once per client
+        self._tree_paths: dict[tuple[str, str], frozenset[str] | None] = {}
+
+    @classmethod
+    def create_session(cls) -> requests.Session:
+        """
+        Create a pooled HTTP session for GitHub API calls.
+
+        All calls go to api.github.com, so keep-alive saves a TCP+TLS
+        handshake on every request after the first. Transient gateway errors
+        are retried; other statuses are returned as-is. The session carries
+        no credentials and may be shared by all clients of a process.
+
+        Returns:
+            Configured requests.Session
+        """
+        session = requests.Session()
+        # requests already sends "Accept-Encoding: gzip, deflate" and
+        # decompresses transparently; GitHub asks clients to identify themselves
+        session.headers["User-Agent"] = cls.USER_AGENT
+        session.mount("https://", HTTPAdapter(
+            pool_connections=10,
+            pool_maxsize=20,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.3,
+                status_forcelist=[502, 503, 504],
+                raise_on_status=False,
+            ),
+        ))
+        return session
+
+    def close(self) -> None:
+        """Close the HTTP session if this client created it."""
+        if self._owns_session:
+            self.session.close()
+
+    def __enter__(self) -> "GitHubClient":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def _request(self, url: str, method: str = "GET", **kwargs) -> requests.Response:
+        """
+        Send a request over the session, waiting out GitHub rate limits.
+
+        A 403/429 reply that carries ``Retry-After`` (secondary limit) or
+        ``X-RateLimit-Remaining: 0`` (primary limit) is retried after the
+        advertised wait, up to RATE_LIMIT_RETRIES times. Once the waits of
+        one call would add up to more than MAX_RATE_LIMIT_WAIT, the limited
+        response is returned as-is.
+
+        Args:
+            url: Full API URL
+            method: HTTP method
+            **kwargs: Passed to ``requests.Session.request``
+
+        Returns:
+            The final response
+        """
+        kwargs["headers"] = {**self.headers, **kwargs.get("headers", {})}
+
+        waited = 0.0
+        for attempt in range(self.RATE_LIMIT_RETRIES + 1):
+            resp = self.session.request(method, url, **kwargs)
+            wait = self._rate_limit_wait(resp)
+            if (
+                wait is None
+                or attempt == self.RATE_LIMIT_RETRIES
+                or waited + wait > self.MAX_RATE_LIMIT_WAIT
+            ):
+                return resp
+            # Release the connection of a streamed response before retrying
+            resp.close()
+            time.sleep(wait)
+            waited += wait
+
+        return resp
+
+    @staticmethod
+    def _rate_limit_wait(resp: requests.Response) -> float | None:
+        """
+        Get seconds to wait before retrying a rate-limited response.
+
+        Args:
+            resp: Response from GitHub API
+
+        Returns:
+            Seconds to wait, or None if the response is not rate-limited
+        """
+        if resp.status_code not in (403, 429):
+            return None
+
+        retry_after = resp.headers.get("Retry-After")
+        if retry_after is not None:
+            try:
+                return max(float(retry_after), 0)
+            except ValueError:
+                return None
+
+        if resp.headers.get("X-RateLimit-Remaining") == "0":
+            try:
+                reset_at = float(resp.headers["X-RateLimit-Reset"])
+            except (KeyError, ValueError):
+                return None
+            return max(reset_at - time.time(), 0)
+
+        return None
+
+    def _get_json(
+        self,
+        url: str,
+        params: dict[str, str] | None = None,
+        ttl: float = 0,
+        transform: Callable[[Any], Any] | None = None
+    ) -> tuple[int, Any]:
+        """
+        GET a JSON resource through the shared response cache.
+
+        Entries younger than ``ttl`` seconds are returned without a request.
+        Older entries are revalidated with If-None-Match: a 304 reply reuses
+        the cached body and does not count against the rate limit.
+        Only 200 responses are cached.
+
+        Args:
+            url: Full API URL
+            params: Query parameters
+            ttl: Seconds a cached response is served without revalidation
+            transform: Applied to a parsed 200 body before it is cached, so
+                only the parts the caller needs are kept in memory
+
+        Returns:
+            Tuple of (status code, parsed JSON body or None)
+        """
+        key = (self.token, url, tuple(sorted(params.items())) if params else ())
+        now = time.monotonic()
+        cached = _RESPONSE_CACHE.get(key)
+
+        headers = {}
+        if cached is not None:
+            expires_at, etag, body = cached
+            if now < expires_at:
+                return 200, body
+            if etag:
+                headers["If-None-Match"] = etag
+
+        resp = self._request(url, params=params, headers=headers)
+
+        if resp.status_code == 304 and cached is not None:
+            _RESPONSE_CACHE[key] = (now + ttl, cached[1], cached[2])
+            return 200, cached[2]
+        if resp.status_code != 200:
+            return resp.status_code, None
+
+        try:
+            body = resp.json()
+        except ValueError:
+            body = None
+        if transform is not None and body is not None:
+            body = transform(body)
+
+        etag = resp.headers.get("ETag")
+        if ttl > 0 or etag:
+            if len(_RESPONSE_CACHE) >= _RESPONSE_CACHE_MAX_ENTRIES:
+                _RESPONSE_CACHE.clear()
+            _RESPONSE_CACHE[key] = (now + ttl, etag, body)
+        return 200, body
+
     def user_exists(self, username: str) -> bool:
         """
         Check if a GitHub user exists.
@@ -59,8 +269,8 @@ class GitHubClient:
             True if user exists, False otherwise
         """
         url = f"{self.BASE_URL}/users/{username}"
-        resp = requests.get(url, headers=self.headers)
-        return resp.status_code == 200
+        status, _ = self._get_json(url, ttl=self.USER_TTL)
+        return status == 200
 
     def file_exists(self, org: str, repo: str, path: str) -> bool:
         """
@@ -75,9 +285,39 @@ class GitHubClient:
             True if file exists, False otherwise
         """
         url = f"{self.BASE_URL}/repos/{org}/{repo}/contents/{path}"
-        resp = requests.get(url, headers=self.headers)
+        # HEAD: same status codes as GET, without downloading the file body
+        resp = self._request(url, method="HEAD", allow_redirects=True)
         return resp.status_code == 200
 
+    def _get_tree_paths(self, org: str, repo: str) -> frozenset[str] | None:
+        """
+        Get all file and directory paths of the repository HEAD.
+
+        Uses one recursive Git Trees API call instead of a contents request
+        per path. The result is memoized on the client per repository.
+
+        Args:
+            org: Organization or user name
+            repo: Repository name
+
+        Returns:
+            Set of paths, or None if the tree is unavailable (e.g. empty
+            repository) or was truncated by GitHub
+        """
+        key = (org, repo)
+        if key not in self._tree_paths:
+            url = f"{self.BASE_URL}/repos/{org}/{repo}/git/trees/HEAD"
+            status, tree_paths = self._get_json(
+                url, params={"recursive": "1"}, transform=_tree_paths
+            )
+
+            paths = None
+            if status == 200 and tree_paths is not None:
+                paths = frozenset(tree_paths)
+            self._tree_paths[key] = paths
+
+        return self._tree_paths[key]
+
     def check_required_files(
         self,
         org: str,
@@ -93,13 +333,30 @@ class GitHubClient:
             required_files: List of file paths to check
 
         Returns:
-            List of missing file paths (empty if all exist)
+            List of missing file paths (empty if all exist), in the order given
+
+        Note:
+            Paths are looked up in the repository tree (one request). If the
+            tree is unavailable, each path is probed with its own request and
+            these are issued concurrently over the shared session.
         """
-        missing = []
-        for file_path in required_files:
-            if not self.file_exists(org, repo, file_path):
-                missing.append(file_path)
-        return missing
+        if not required_files:
+            return []
+
+        tree = self._get_tree_paths(org, repo)
+        if tree is not None:
+            return [p for p in required_files if p.strip("/") not in tree]
+
+        if len(required_files) == 1:
+            return [p for p in required_files if not self.file_exists(org, repo, p)]
+
+        workers = min(len(required_files), self.MAX_PARALLEL_REQUESTS)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            exists = list(executor.map(
+                lambda file_path: self.file_exists(org, repo, file_path),
+                required_files,
+            ))
+        return [p for p, ok in zip(required_files, exists) if not ok]
 
     def has_workflows_directory(self, org: str, repo: str) -> bool:
         """
@@ -112,6 +369,9 @@ class GitHubClient:
         Returns:
             True if workflows directory exists
         """
+        tree = self._get_tree_paths(org, repo)
+        if tree is not None:
+            return ".github/workflows" in tree
         return self.file_exists(org, repo, ".github/workflows")
 
     def get_latest_commit(self, org: str, repo: str) -> CommitInfo | None:
@@ -125,14 +385,15 @@ class GitHubClient:
         Returns:
             CommitInfo with SHA and modified files, or None if no commits
         """
-        # Get commits list
+        # Get commits list (only the newest entry is needed)
         commits_url = f"{self.BASE_URL}/repos/{org}/{repo}/commits"
-        commits_resp = requests.get(commits_url, headers=self.headers)
+        status, commits_data = self._get_json(
+            commits_url, params={"per_page": "1"}, ttl=self.LATEST_COMMIT_TTL
+        )
 
-        if commits_resp.status_code != 200:
+        if status != 200:
             return None
 
-        commits_data = commits_resp.json()
         if not commits_data:
             return None
 
@@ -140,16 +401,14 @@ class GitHubClient:
 
         # Get commit details with files
         commit_url = f"{self.BASE_URL}/repos/{org}/{repo}/commits/{latest_sha}"
-        commit_resp = requests.get(commit_url, headers=self.headers)
+        status, files = self._get_json(
+            commit_url, ttl=self.COMMIT_DETAIL_TTL, transform=_commit_files
+        )
 
-        if commit_resp.status_code != 200:
+        if status != 200 or files is None:
             return CommitInfo(sha=latest_sha, files=[])
 
-        commit_data = commit_resp.json()
-        return CommitInfo(
-            sha=latest_sha,
-            files=commit_data.get("files", [])
-        )
+        return CommitInfo(sha=latest_sha, files=files)
 
     def get_check_runs(
         self,
@@ -167,14 +426,32 @@ class GitHubClient:
 
         Returns:
             List of check run dicts from GitHub API, or None on error
+
+        Note:
+            Pages of the maximum size are requested, and further pages are
+            fetched only while fewer than ``total_count`` runs have been seen,
+            so no empty trailing page is requested.
         """
         url = f"{self.BASE_URL}/repos/{org}/{repo}/commits/{commit_sha}/check-runs"
-        resp = requests.get(url, headers=self.headers)
+        check_runs: list[dict[str, Any]] = []
+        page = 1
 
-        if resp.status_code != 200:
-            return None
+        while True:
+            status, data = self._get_json(
+                url,
+                params={"per_page": str(self.CHECK_RUNS_PER_PAGE), "page": str(page)},
+                ttl=self.CHECK_RUNS_TTL,
+            )
+
+            if status != 200 or data is None:
+                return None
+
+            batch = data.get("check_runs", [])
+            check_runs.extend(batch)
 
-        return resp.json().get("check_runs", [])
+            if not batch or len(check_runs) >= data.get("total_count", 0):
+                return check_runs
+            page += 1
 
     def get_job_logs(self, org: str, repo: str, job_id: int) -> str | None:
         """
@@ -189,7 +466,8 @@ class GitHubClient:
             Log text or None if not available
         """
         url = f"{self.BASE_URL}/repos/{org}/{repo}/actions/jobs/{job_id}/logs"
-        resp = requests.get(url, headers=self.headers)
+
+        resp = self._request(url)
 
         if resp.status_code != 200:
             return None
@@ -199,6 +477,65 @@ class GitHubClient:
         resp.encoding = 'utf-8'
         return resp.text
 
+    def get_job_logs_stream(self, org: str, repo: str, job_id: int) -> Iterator[str] | None:
+        """
+        Get logs for a specific workflow job as a stream of lines.
+
+        The body is read lazily, so a caller that stops iterating early does
+        not download or decode the rest of the log. The connection is
+        released when the iterator is exhausted or closed.
+
+        Args:
+            org: Organization or user name
+            repo: Repository name
+            job_id: Job ID from check run
+
+        Returns:
+            Iterator over log lines (without line endings), or None if not available
+        """
+        url = f"{self.BASE_URL}/repos/{org}/{repo}/actions/jobs/{job_id}/logs"
+        resp = self._request(url, stream=True)
+
+        if resp.status_code != 200:
+            resp.close()
+            return None
+
+        # Same as get_job_logs: logs are UTF-8 but served without a charset
+        resp.encoding = 'utf-8'
+        return self._iter_lines(resp)
+
+    @staticmethod
+    def _iter_lines(resp: requests.Response) -> Iterator[str]:
+        """Yield decoded lines of a streamed response, then close it."""
+        with resp:
+            yield from resp.iter_lines(decode_unicode=True)
+
+
+def _commit_files(commit_data: dict[str, Any]) -> list[dict[str, Any]]:
+    """
+    Keep only filename and status of each file in a commit detail response.
+
+    The response also carries the full patch of every file, which can be
+    large (e.g. committed build output) and is not needed for grading.
+    """
+    return [
+        {"filename": f.get("filename", ""), "status": f.get("status", "")}
+        for f in commit_data.get("files", [])
+    ]
+
+
+def _tree_paths(tree_data: dict[str, Any]) -> list[str] | None:
+    """
+    Keep only the paths of a recursive tree response.
+
+    Trees of repositories with committed dependencies or build output can
+    have tens of thousands of entries; mode, sha, size and url of each are
+    not needed. A truncated tree is not used at all, so nothing is kept.
+    """
+    if tree_data.get("truncated"):
+        return None
+    return [entry["path"] for entry in tree_data.get("tree", [])]
+
 
 def check_forbidden_modifications(
     commit_files: list[dict[str, Any]],
@@ -219,21 +556,22 @@ def check_forbidden_modifications(
         >>> check_forbidden_modifications(files, ["test_main.py"])
         ['test_main.py']
     """
+    if not forbidden_patterns:
+        return []
+
+    # Exact match or prefix match (for directories like "tests/"): an exact
+    # match is also a prefix match, so one str.startswith over the tuple covers both
+    prefixes = tuple(forbidden_patterns)
     violations = []
 
     for file_info in commit_files:
-        filename = file_info.get("filename", "")
-        status = file_info.get("status", "")
-
         # Only check removed or modified files
-        if status not in ("removed", "modified"):
+        if file_info.get("status", "") not in _FORBIDDEN_STATUSES:
             continue
 
-        for pattern in forbidden_patterns:
-            # Exact match or prefix match (for directories like "tests/")
-            if filename == pattern or filename.startswith(pattern):
-                violations.append(filename)
-                break
+        filename = file_info.get("filename", "")
+        if filename.startswith(prefixes):
+            violations.append(filename)
 
     return violations
 
@@ -250,10 +588,7 @@ def get_default_forbidden_patterns(required_files: list[str]) -> list[str]:
     Returns:
         List of forbidden patterns
     """
-    patterns = []
-
     if "test_main.py" in required_files:
-        patterns.append("test_main.py")
-        patterns.append("tests/")
+        return list(_TEST_FORBIDDEN_PATTERNS)
 
-    return patterns
+    return []
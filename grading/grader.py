@@ -5,13 +5,19 @@ This module provides the main LabGrader class that orchestrates
 all grading operations: GitHub checks, CI evaluation, and result formatting.
 """
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
-from typing import Any
+from itertools import takewhile
+from typing import Any, Callable, Iterable, Iterator, TypeVar
 
 from .github_client import (
     GitHubClient,
+    CommitInfo,
     check_forbidden_modifications,
     get_default_forbidden_patterns,
 )
@@ -25,11 +31,36 @@ from .ci_checker import (
 )
 from .sheets_client import can_overwrite_cell
 from .penalty import calculate_penalty, format_grade_with_penalty, PenaltyStrategy
-from .taskid import extract_taskid_from_logs, calculate_expected_taskid, validate_taskid
-from .score import extract_score_from_logs
+from .taskid import (
+    extract_taskid_from_lines,
+    calculate_expected_taskid,
+    validate_taskid,
+    TaskIdResult,
+)
+from .score import extract_score_from_logs, format_grade_with_score, format_score
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+# Commits that passed the repository checks, shared by all graders (one is
+# created per request): (org, repo, required files) -> (sha, expires_at)
+_VALIDATED_COMMITS: dict[tuple[str, str, tuple[str, ...]], tuple[str, float]] = {}
+_VALIDATED_COMMITS_MAX_ENTRIES = 1024
+VALIDATION_TTL = 600  # Seconds
+
+
+def clear_validation_cache() -> None:
+    """Forget which commits passed the repository checks."""
+    _VALIDATED_COMMITS.clear()
+
+
+def _close_lines(lines: Iterable[str]) -> None:
+    """Close a streamed log (releasing its connection) if it can be closed."""
+    close = getattr(lines, "close", None)
+    if close is not None:
+        close()
+
 
 class GradeStatus(Enum):
     """Possible grading outcomes."""
@@ -39,7 +70,7 @@ class GradeStatus(Enum):
     ERROR = "error"          # Error during grading
 
 
-@dataclass
+@dataclass(slots=True)
 class GradeResult:
     """Result of a grading operation."""
     status: GradeStatus
@@ -52,7 +83,7 @@ class GradeResult:
     score: str | None = None  # Score extracted from logs (e.g., "10.5")
 
 
-@dataclass
+@dataclass(slots=True)
 class CIEvaluation:
     """Internal result of CI evaluation with full details."""
     grade_result: GradeResult  # The GradeResult to return
@@ -73,6 +104,8 @@ class LabGrader:
     Lab config is passed as dict directly from YAML, no separate config class needed.
     """
 
+    MAX_PARALLEL_LOG_FETCHES = 4  # Job logs are the largest downloads in a grading run
+
     def __init__(self, github_client: GitHubClient):
         """
         Initialize grader with GitHub client.
@@ -87,7 +120,7 @@ class LabGrader:
         org: str,
         repo_name: str,
         lab_config: dict[str, Any]
-    ) -> GradeResult | None:
+    ) -> tuple[GradeResult | None, CommitInfo | None]:
         """
         Perform repository-level checks.
 
@@ -96,16 +129,36 @@ class LabGrader:
         - Workflows directory exists
         - Repository has commits
 
+        The commit fetched for the last check is returned so later steps
+        (forbidden files, CI) can reuse it instead of fetching it again.
+
         Args:
             org: GitHub organization
             repo_name: Repository name
             lab_config: Lab configuration dict from YAML
 
         Returns:
-            GradeResult with error if check fails, None if all pass
+            Tuple of (GradeResult with error or None if all pass, latest
+            commit or None if it was not reached)
+
+        Note:
+            The latest commit is only fetched after files and workflows pass,
+            so an error there costs no commit requests. A commit that passed
+            these checks recently is not checked again (students re-poll
+            while CI is running; the tree can't change without a new commit).
         """
-        # Check required files
         required_files = lab_config.get("files", [])
+        validated_key = (org, repo_name, tuple(required_files))
+
+        commit = None
+        validated = _VALIDATED_COMMITS.get(validated_key)
+        if validated is not None and time.monotonic() < validated[1]:
+            commit = self.github.get_latest_commit(org, repo_name)
+            if commit is not None and commit.sha == validated[0]:
+                logger.info(f"Commit {commit.sha} of {repo_name} already validated, skipping repository checks")
+                return None, commit
+
+        # Check required files
         if required_files:
             missing = self.github.check_required_files(org, repo_name, required_files)
             if missing:
@@ -115,7 +168,7 @@ class LabGrader:
                     message=f"⚠️ Файл {missing[0]} не найден в репозитории",
                     passed=None,
                     error_code="MISSING_FILES",
-                )
+                ), None
 
         # Check workflows directory
         if not self.github.has_workflows_directory(org, repo_name):
@@ -125,10 +178,12 @@ class LabGrader:
                 message="⚠️ Папка .github/workflows не найдена. CI не настроен",
                 passed=None,
                 error_code="NO_WORKFLOWS",
-            )
+            ), None
+
+        if commit is None:
+            commit = self.github.get_latest_commit(org, repo_name)
 
         # Check for commits
-        commit = self.github.get_latest_commit(org, repo_name)
         if commit is None:
             return GradeResult(
                 status=GradeStatus.ERROR,
@@ -136,15 +191,19 @@ class LabGrader:
                 message="Нет коммитов в репозитории",
                 passed=None,
                 error_code="NO_COMMITS",
-            )
+            ), None
 
-        return None
+        if len(_VALIDATED_COMMITS) >= _VALIDATED_COMMITS_MAX_ENTRIES:
+            _VALIDATED_COMMITS.clear()
+        _VALIDATED_COMMITS[validated_key] = (commit.sha, time.monotonic() + VALIDATION_TTL)
+        return None, commit
 
     def check_forbidden_files(
         self,
         org: str,
         repo_name: str,
-        lab_config: dict[str, Any]
+        lab_config: dict[str, Any],
+        commit: CommitInfo | None = None,
     ) -> GradeResult | None:
         """
         Check for forbidden file modifications.
@@ -153,15 +212,13 @@ class LabGrader:
             org: GitHub organization
             repo_name: Repository name
             lab_config: Lab configuration dict from YAML
+            commit: Latest commit if already fetched (None = fetch it)
 
         Returns:
             GradeResult with error if violation found, None otherwise
         """
-        commit = self.github.get_latest_commit(org, repo_name)
-        if commit is None:
-            return None
-
-        # Get forbidden patterns from config or defaults
+        # Get forbidden patterns from config or defaults; without any there
+        # is nothing to check and the commit need not be fetched
         required_files = lab_config.get("files", [])
         forbidden = lab_config.get("forbidden-modifications", []).copy()
         if not forbidden:
@@ -170,6 +227,11 @@ class LabGrader:
         if not forbidden:
             return None
 
+        if commit is None:
+            commit = self.github.get_latest_commit(org, repo_name)
+        if commit is None:
+            return None
+
         violations = check_forbidden_modifications(commit.files, forbidden)
 
         if violations:
@@ -202,6 +264,51 @@ class LabGrader:
 
         return None
 
+    def _scan_job_logs(
+        self,
+        runs: list[CheckRun],
+        scan: Callable[[int, threading.Event], T | None],
+    ) -> Iterator[tuple[CheckRun, int, T | None]]:
+        """
+        Run a log scan for several CI jobs concurrently.
+
+        ``scan`` is called with each job ID on a worker thread, so both the
+        log download and its parsing overlap across jobs. Results are yielded
+        in run order, so callers see the same sequence as with one-by-one
+        processing. Runs whose URL carries no job ID are logged and skipped.
+        Closing the generator early cancels scans not yet started and sets
+        the stop event passed to ``scan``, so running scans can end too.
+
+        Args:
+            runs: CheckRun objects whose job logs should be scanned
+            scan: Function of job ID and stop event returning the scan
+                result (None if the logs could not be fetched); it should
+                stop reading logs once the event is set
+
+        Yields:
+            Tuples of (run, job_id, scan result)
+        """
+        jobs = []
+        for run in runs:
+            if run.job_id is None:
+                logger.warning(f"Job {run.name}: could not extract job_id from URL: {run.html_url}")
+                continue
+            logger.info(f"Checking job: {run.name} (conclusion: {run.conclusion}, ID: {run.job_id})")
+            jobs.append((run, run.job_id))
+
+        if not jobs:
+            return
+
+        stop = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=min(len(jobs), self.MAX_PARALLEL_LOG_FETCHES))
+        try:
+            futures = [executor.submit(scan, job_id, stop) for _, job_id in jobs]
+            for (run, job_id), future in zip(jobs, futures):
+                yield run, job_id, future.result()
+        finally:
+            stop.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+
     def check_taskid(
         self,
         org: str,
@@ -224,45 +331,43 @@ class LabGrader:
         Returns:
             GradeResult with error if TASKID mismatch, None if OK
         """
-        logger.info(f"TASKID check for {repo_name}: checking {len(successful_runs)} successful job(s)")
-        logger.info(f"Expected TASKID: {expected_taskid}")
+        logger.info(
+            f"TASKID check for {repo_name}: checking {len(successful_runs)} successful job(s), "
+            f"expected TASKID: {expected_taskid}"
+        )
 
         taskid_found = None
         taskid_error = None
 
-        # Try to get TASKID from any successful job's logs
-        for run in successful_runs:
-            logger.info(f"Checking job: {run.name} (conclusion: {run.conclusion})")
-
-            # Extract job ID from html_url (format: .../job/12345)
-            if "/job/" in run.html_url:
-                try:
-                    job_id = int(run.html_url.split("/job/")[-1].split("?")[0])
-                    logger.info(f"  Job ID: {job_id}, URL: {run.html_url}")
-                except (ValueError, IndexError):
-                    logger.warning(f"  Could not extract job_id from URL: {run.html_url}")
-                    continue
-
-                logs = self.github.get_job_logs(org, repo_name, job_id)
-                if logs:
-                    logger.info(f"  Logs fetched, size: {len(logs)} chars")
-                    result = extract_taskid_from_logs(logs)
-                    if result.found is not None:
-                        logger.info(f"  ✓ TASKID found in logs: {result.found}")
-                        taskid_found = result.found
-                        break
-                    elif result.error:
-                        if "несколько" in result.error:
-                            # Multiple different TASKIDs - this is an error
-                            logger.error(f"  ✗ {result.error}")
-                            taskid_error = result.error
-                            break
-                        else:
-                            logger.info(f"  ✗ TASKID not found in this job's logs: {result.error}")
-                else:
+        def scan(job_id: int, stop: threading.Event) -> TaskIdResult | None:
+            # Streamed: the log is scanned line by line, never held whole
+            lines = self.github.get_job_logs_stream(org, repo_name, job_id)
+            if lines is None:
+                return None
+            try:
+                # The result is discarded once stopped; just stop downloading
+                return extract_taskid_from_lines(takewhile(lambda _: not stop.is_set(), lines))
+            finally:
+                _close_lines(lines)
+
+        # Try to get TASKID from any successful job's logs; closing the scan
+        # on break stops the other jobs' downloads right away
+        with closing(self._scan_job_logs(successful_runs, scan)) as results:
+            for run, job_id, result in results:
+                if result is None:
                     logger.warning(f"  Could not fetch logs for job {job_id}")
-            else:
-                logger.warning(f"  Job URL doesn't contain /job/: {run.html_url}")
+                elif result.found is not None:
+                    logger.info(f"  ✓ TASKID found in logs of job {job_id}: {result.found}")
+                    taskid_found = result.found
+                    break
+                elif result.error:
+                    if "несколько" in result.error:
+                        # Multiple different TASKIDs - this is an error
+                        logger.error(f"  ✗ {result.error}")
+                        taskid_error = result.error
+                        break
+                    else:
+                        logger.info(f"  ✗ TASKID not found in logs of job {job_id}: {result.error}")
 
         if taskid_error:
             return GradeResult(
@@ -334,14 +439,9 @@ class LabGrader:
         for idx, run in enumerate(successful_runs, 1):
             logger.info(f"Checking job {idx}/{len(successful_runs)}: {run.name} (conclusion: {run.conclusion})")
 
-            # Extract job ID from html_url (format: .../job/12345)
-            if "/job/" in run.html_url:
-                try:
-                    job_id = int(run.html_url.split("/job/")[-1].split("?")[0])
-                    logger.info(f"  Job ID: {job_id}, URL: {run.html_url}")
-                except (ValueError, IndexError):
-                    logger.warning(f"  Could not extract job_id from URL: {run.html_url}")
-                    continue
+            job_id = run.job_id
+            if job_id is not None:
+                logger.info(f"  Job ID: {job_id}, URL: {run.html_url}")
 
                 logs = self.github.get_job_logs(org, repo_name, job_id)
                 if logs:
@@ -362,7 +462,7 @@ class LabGrader:
                 else:
                     logger.warning(f"  Could not fetch logs for job {job_id}")
             else:
-                logger.warning(f"  Job URL doesn't contain /job/: {run.html_url}")
+                logger.warning(f"  Could not extract job_id from URL: {run.html_url}")
 
         if score_error:
             return None, GradeResult(
@@ -389,7 +489,8 @@ class LabGrader:
         self,
         org: str,
         repo_name: str,
-        lab_config: dict[str, Any]
+        lab_config: dict[str, Any],
+        commit: CommitInfo | None = None,
     ) -> CIEvaluation:
         """
         Evaluate CI results with full details for internal use.
@@ -401,11 +502,13 @@ class LabGrader:
             org: GitHub organization
             repo_name: Repository name
             lab_config: Lab configuration dict from YAML
+            commit: Latest commit if already fetched (None = fetch it)
 
         Returns:
             CIEvaluation with full CI details
         """
-        commit = self.github.get_latest_commit(org, repo_name)
+        if commit is None:
+            commit = self.github.get_latest_commit(org, repo_name)
         if commit is None:
             return CIEvaluation(
                 grade_result=GradeResult(
@@ -444,8 +547,9 @@ class LabGrader:
         # Parse and filter check runs
         check_runs = parse_check_runs(check_runs_data)
         logger.info(f"Total check runs found: {len(check_runs)}")
-        for run in check_runs:
-            logger.debug(f"  Check run: {run.name} (conclusion: {run.conclusion})")
+        if logger.isEnabledFor(logging.DEBUG):
+            for run in check_runs:
+                logger.debug(f"  Check run: {run.name} (conclusion: {run.conclusion})")
 
         ci_jobs = get_ci_config_jobs(lab_config)
         if ci_jobs:
@@ -454,9 +558,11 @@ class LabGrader:
             logger.info("No specific CI jobs configured - will use all relevant jobs")
 
         relevant_runs = filter_relevant_jobs(check_runs, ci_jobs)
-        logger.info(f"Relevant check runs after filtering: {len(relevant_runs)}")
-        for run in relevant_runs:
-            logger.info(f"  Relevant job: {run.name} (conclusion: {run.conclusion})")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                f"Relevant check runs after filtering: {len(relevant_runs)} "
+                f"[{', '.join(f'{run.name}: {run.conclusion}' for run in relevant_runs)}]"
+            )
 
         if not relevant_runs:
             return CIEvaluation(
@@ -484,11 +590,13 @@ class LabGrader:
                 ci_passed=False,
             )
 
-        # Get successful runs for TASKID extraction
-        successful_runs = [run for run in relevant_runs if run.conclusion == "success"]
-        logger.info(f"Successful runs for TASKID extraction: {len(successful_runs)}")
-        for run in successful_runs:
-            logger.info(f"  Success job: {run.name}")
+        # Successful runs for TASKID extraction (collected during evaluation)
+        successful_runs = ci_result.successful_runs
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                f"Successful runs for TASKID extraction: {len(successful_runs)} "
+                f"[{', '.join(run.name for run in successful_runs)}]"
+            )
 
         # Determine grade
         final_result = "v" if ci_result.passed else "x"
@@ -593,18 +701,18 @@ class LabGrader:
         repo_name = f"{github_prefix}-{username}"
         logger.info(f"Grading repository: {org}/{repo_name}")
 
-        # Step 1: Repository checks
-        repo_error = self.check_repository(org, repo_name, lab_config)
+        # Step 1: Repository checks (the latest commit is reused below)
+        repo_error, commit = self.check_repository(org, repo_name, lab_config)
         if repo_error:
             return repo_error
 
         # Step 2: Forbidden files check
-        forbidden_error = self.check_forbidden_files(org, repo_name, lab_config)
+        forbidden_error = self.check_forbidden_files(org, repo_name, lab_config, commit)
         if forbidden_error:
             return forbidden_error
 
         # Step 3: CI evaluation (use internal method for full details)
-        ci_evaluation = self._evaluate_ci_internal(org, repo_name, lab_config)
+        ci_evaluation = self._evaluate_ci_internal(org, repo_name, lab_config, commit)
 
         # If CI is pending or error, return as-is
         if ci_evaluation.grade_result.status != GradeStatus.UPDATED:
@@ -648,8 +756,6 @@ class LabGrader:
                 logger.info(f"Calculated penalty: {penalty}")
 
         # Step 6: Format grade with score and penalty
-        from .score import format_grade_with_score, format_score
-
         score_value = ci_evaluation.score
         final_result = "v"
 
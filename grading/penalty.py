@@ -4,7 +4,7 @@ Penalty calculation for late lab submissions.
 This module contains pure functions for calculating penalty points
 based on submission time relative to deadline.
 """
-from datetime import datetime
+from datetime import datetime, timedelta
 from enum import Enum
 
 
@@ -16,6 +16,26 @@ class PenaltyStrategy(Enum):
     DAILY = "daily"             # 1 point per day late
 
 
+def _weekly_penalty(delta: timedelta, penalty_max: int) -> int:
+    """1 point per week late, rounded up."""
+    weeks = delta.days // 7 + (1 if delta.days % 7 > 0 or delta.seconds > 0 else 0)
+    return min(weeks, penalty_max)
+
+
+def _daily_penalty(delta: timedelta, penalty_max: int) -> int:
+    """1 point per day late; any part of a day counts as a full day."""
+    days = delta.days + (1 if delta.seconds > 0 else 0)
+    return min(days, penalty_max)
+
+
+_PENALTY_FUNCS = {
+    PenaltyStrategy.WEEKLY: _weekly_penalty,
+    PenaltyStrategy.IMMEDIATE_MAX: lambda delta, penalty_max: penalty_max,
+    PenaltyStrategy.NONE: lambda delta, penalty_max: 0,
+    PenaltyStrategy.DAILY: _daily_penalty,
+}
+
+
 def calculate_penalty(
     completed_at: datetime,
     deadline: datetime,
@@ -47,22 +67,9 @@ def calculate_penalty(
     if completed_at <= deadline:
         return 0
 
-    if strategy == PenaltyStrategy.NONE:
-        return 0
-
-    if strategy == PenaltyStrategy.IMMEDIATE_MAX:
-        return penalty_max
-
-    delta = completed_at - deadline
-
-    if strategy == PenaltyStrategy.DAILY:
-        # Round up: any part of a day counts as a full day
-        days = delta.days + (1 if delta.seconds > 0 else 0)
-        return min(days, penalty_max)
-
-    # WEEKLY (default): 1 point per week, rounded up
-    weeks = delta.days // 7 + (1 if delta.days % 7 > 0 or delta.seconds > 0 else 0)
-    return min(weeks, penalty_max)
+    # Unknown strategies fall back to WEEKLY, the default
+    penalty_func = _PENALTY_FUNCS.get(strategy, _weekly_penalty)
+    return penalty_func(completed_at - deadline, penalty_max)
 
 
 def format_grade_with_penalty(base_grade: str, penalty: int) -> str:
@@ -4,9 +4,14 @@ Score extraction from GitHub Actions logs.
 This module contains functions for extracting student scores (points)
 from GitHub Actions job logs using configurable regex patterns.
 """
+import logging
 import re
 from dataclasses import dataclass
-from decimal import Decimal, InvalidOperation
+from functools import lru_cache
+
+from .penalty import format_grade_with_penalty
+
+logger = logging.getLogger(__name__)
 
 
 @dataclass
@@ -16,6 +21,72 @@ class ScoreResult:
     error: str | None = None
 
 
+@lru_cache(maxsize=256)
+def _compile(pattern: str) -> re.Pattern:
+    """
+    Compile a score pattern once and reuse it across calls.
+
+    Score patterns come from lab configs, so the set of distinct patterns
+    is small; caching keeps repeated grading runs from re-parsing them.
+
+    Raises:
+        re.error: If the pattern is not a valid regular expression
+    """
+    return re.compile(pattern, re.MULTILINE | re.IGNORECASE)
+
+
+# Translation tables for format_score
+_TO_COMMA = str.maketrans('.', ',')
+_TO_DOT = str.maketrans(',', '.')
+
+# (1-based index in the config, pattern, compiled pattern)
+_Candidate = tuple[int, str, re.Pattern]
+
+
+@lru_cache(maxsize=32)
+def _prepare_patterns(patterns: tuple[str, ...]) -> tuple[_Candidate, ...]:
+    """
+    Compile a pattern list once per distinct config.
+
+    The same lab config is graded over and over, so invalid patterns are
+    dropped (and logged) once here instead of on every grading run.
+
+    Args:
+        patterns: Score patterns from the lab config, in priority order
+
+    Returns:
+        Valid patterns as candidates, in priority order
+    """
+    candidates = []
+    for idx, pattern in enumerate(patterns, 1):
+        try:
+            candidates.append((idx, pattern, _compile(pattern)))
+        except re.error as e:
+            # Logged once per config, not on every grading run
+            logger.warning(f"Invalid regex pattern '{pattern}': {e}")
+    return tuple(candidates)
+
+
+def _first_matching(candidates: tuple[_Candidate, ...], logs: str) -> int | None:
+    """
+    Find the first candidate (by list order) that matches anywhere in logs.
+
+    search() stops at the first match, so this is cheaper than running
+    findall for every pattern that is tried.
+
+    Args:
+        candidates: Valid score patterns, in priority order
+        logs: Full text of the job logs
+
+    Returns:
+        Index into candidates, or None if none of them match
+    """
+    for i, (_, _, compiled) in enumerate(candidates):
+        if compiled.search(logs):
+            return i
+    return None
+
+
 def normalize_score(score_str: str) -> str:
     """
     Normalize score string to use consistent decimal separator.
@@ -62,20 +133,35 @@ def scores_equal(score1: str, score2: str) -> bool:
         False
     """
     try:
-        # Replace comma with dot for numeric comparison
-        val1 = Decimal(score1.replace(',', '.'))
-        val2 = Decimal(score2.replace(',', '.'))
-        return val1 == val2
-    except (InvalidOperation, ValueError):
+        # Replace comma with dot for numeric comparison. Scores have one or
+        # two decimal digits, well within float precision.
+        return float(score1.replace(',', '.')) == float(score2.replace(',', '.'))
+    except ValueError:
         # Fallback to string comparison if not valid numbers
         return score1 == score2
 
 
+def _score_key(score: str) -> float | str:
+    """
+    Hashable key under which equal scores collide (see scores_equal).
+
+    Args:
+        score: Normalized score string
+
+    Returns:
+        Numeric value of the score, or the string itself if not a number
+    """
+    try:
+        return float(score.replace(',', '.'))
+    except ValueError:
+        return score
+
+
 def extract_score_from_logs(logs: str, patterns: list[str]) -> ScoreResult:
     """
     Extract score from GitHub Actions job logs using multiple patterns.
 
-    Tries each pattern in order until a match is found.
+    Uses the first pattern (in list order) that matches anywhere in the logs.
     If multiple occurrences are found, they must all be the same value.
 
     GitHub Actions logs have timestamps at the beginning of each line like:
@@ -95,35 +181,39 @@ def extract_score_from_logs(logs: str, patterns: list[str]) -> ScoreResult:
         >>> result.found
         '10.5'
     """
-    import logging
-    logger = logging.getLogger(__name__)
-
     if not logs:
         return ScoreResult(found=None, error="Логи пусты")
 
     if not patterns:
         return ScoreResult(found=None, error="Паттерны для поиска баллов не указаны")
 
-    logger.debug(f"Searching for score in logs (size: {len(logs)} chars, {len(logs.splitlines())} lines)")
+    if logger.isEnabledFor(logging.DEBUG):
+        # Count newlines rather than building a list of lines
+        num_lines = logs.count('\n') + 1
+        logger.debug(f"Searching for score in logs (size: {len(logs)} chars, {num_lines} lines)")
+
+    candidates = _prepare_patterns(tuple(patterns))
 
     all_matches = []
     matched_pattern = None
 
-    # Try each pattern until we find matches
-    for idx, pattern in enumerate(patterns, 1):
-        logger.debug(f"Trying pattern {idx}/{len(patterns)}: {pattern}")
-        try:
-            # Search across all lines
-            matches = re.findall(pattern, logs, re.MULTILINE | re.IGNORECASE)
-
-            if matches:
-                logger.info(f"✓ Pattern {idx} matched {len(matches)} time(s)")
-                all_matches = matches
-                matched_pattern = pattern
-                break
-        except re.error as e:
-            logger.warning(f"Invalid regex pattern '{pattern}': {e}")
-            continue
+    if candidates:
+        # The first pattern is the one that matches in the common case.
+        # Otherwise the remaining patterns are only searched, and findall
+        # runs once for the pattern that matched.
+        idx, pattern, compiled = candidates[0]
+        matches = compiled.findall(logs)
+        if not matches and len(candidates) > 1:
+            rest = candidates[1:]
+            pos = _first_matching(rest, logs)
+            if pos is not None:
+                idx, pattern, compiled = rest[pos]
+                matches = compiled.findall(logs)
+
+        if matches:
+            logger.info(f"✓ Pattern {idx} matched {len(matches)} time(s)")
+            all_matches = matches
+            matched_pattern = pattern
 
     if not all_matches:
         logger.debug(f"No matches found for any of {len(patterns)} pattern(s)")
@@ -136,11 +226,13 @@ def extract_score_from_logs(logs: str, patterns: list[str]) -> ScoreResult:
     normalized_matches = [normalize_score(m) for m in all_matches]
 
     # Check all matches are the same value (allow different separators)
+    seen = set()
     unique_scores = []
     for score in normalized_matches:
-        # Check if this score is already in unique list (considering "10.5" == "10,5")
-        is_duplicate = any(scores_equal(score, existing) for existing in unique_scores)
-        if not is_duplicate:
+        # Same key for "10.5", "10,5" and "10.50"
+        key = _score_key(score)
+        if key not in seen:
+            seen.add(key)
             unique_scores.append(score)
 
     if len(unique_scores) > 1:
@@ -178,13 +270,8 @@ def format_score(score: str, separator: str = '.') -> str:
     if separator not in ('.', ','):
         raise ValueError(f"Invalid separator: {separator}")
 
-    # Normalize to dot first
-    normalized = score.replace(',', '.')
-
-    # Convert to desired separator
-    if separator == ',':
-        return normalized.replace('.', ',')
-    return normalized
+    # One pass, whichever separator the score was written with
+    return score.translate(_TO_COMMA if separator == ',' else _TO_DOT)
 
 
 def format_grade_with_score(
@@ -215,8 +302,4 @@ def format_grade_with_score(
         >>> format_grade_with_score("v", "10", 0, ".")
         'v@10'
     """
-    formatted_score = format_score(score, separator)
-
-    if penalty > 0:
-        return f"{base_grade}@{formatted_score}-{penalty}"
-    return f"{base_grade}@{formatted_score}"
+    return format_grade_with_penalty(f"{base_grade}@{format_score(score, separator)}", penalty)
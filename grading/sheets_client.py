@@ -5,16 +5,60 @@ This module provides helpers for interacting with Google Sheets
 to find students, update grades, and manage lab data.
 """
 import logging
-from dataclasses import dataclass
-from datetime import datetime
+import re
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from typing import Any
 
 logger = logging.getLogger(__name__)
 
 # Cell protection rules: these values can be overwritten
-OVERWRITABLE_VALUES = {"", "x", "?"}
+OVERWRITABLE_VALUES = frozenset({"", "x", "?"})
 OVERWRITABLE_PREFIXES = ("?",)  # Cells starting with "?" can be overwritten
 
+# Timezone strings from course config, e.g. "UTC+3"
+_UTC_OFFSET_RE = re.compile(r'UTC([+-]\d+)')
+
+# Locales that use comma as decimal separator
+_COMMA_LOCALES = frozenset({
+    'ru_RU', 'ru', 'de_DE', 'de', 'fr_FR', 'fr', 'es_ES', 'es',
+    'it_IT', 'it', 'pt_BR', 'pt', 'nl_NL', 'nl', 'pl_PL', 'pl',
+    'cs_CZ', 'cs', 'sv_SE', 'sv', 'da_DK', 'da', 'fi_FI', 'fi',
+    'no_NO', 'no', 'tr_TR', 'tr', 'el_GR', 'el', 'hu_HU', 'hu',
+})
+
+# Decimal separator per spreadsheet id: (separator, expiry on the monotonic clock)
+_SEPARATOR_CACHE: dict[str, tuple[str, float]] = {}
+_SEPARATOR_CACHE_MAX_ENTRIES = 256
+SEPARATOR_TTL = 3600  # Seconds
+
+
+def clear_separator_cache() -> None:
+    """Forget the decimal separators looked up for spreadsheets."""
+    _SEPARATOR_CACHE.clear()
+
+
+# Deadline cell formats, tried in order
+_DEADLINE_FORMATS = (
+    "%d.%m.%Y %H:%M",      # 15.03.2025 23:59
+    "%d.%m.%Y",             # 15.03.2025
+    "%Y-%m-%d %H:%M:%S",    # 2025-03-15 23:59:59
+    "%Y-%m-%d %H:%M",       # 2025-03-15 23:59
+    "%Y-%m-%d",             # 2025-03-15
+    "%Y-%m-%dT%H:%M:%S",    # ISO format
+)
+
+# Matches exactly the strings the formats above accept with single spaces,
+# so the common cases skip strptime; anything else still goes through it
+_DEADLINE_RE = re.compile(
+    r'(?P<d>\d{1,2})\.(?P<m>\d{1,2})\.(?P<Y>\d{4})(?: (?P<H>\d{1,2}):(?P<M>\d{1,2}))?'
+    r'|(?P<iso_Y>\d{4})-(?P<iso_m>\d{1,2})-(?P<iso_d>\d{1,2})'
+    r'(?:(?: |T(?=\d{1,2}:\d{1,2}:))(?P<iso_H>\d{1,2}):(?P<iso_M>\d{1,2})(?::(?P<iso_S>\d{1,2}))?)?',
+    re.ASCII,  # strptime only accepts ASCII digits
+)
+
 
 @dataclass
 class StudentLocation:
@@ -31,6 +75,93 @@ class LabColumn:
     short_name: str
 
 
+@dataclass(slots=True)
+class SheetSnapshot:
+    """
+    In-memory copy of worksheet values, read with a single API call.
+
+    Lookups that would otherwise cost one Sheets request each (cell,
+    row_values, col_values, find) are answered from here. Indices are
+    1-based like in gspread; cells outside the fetched grid read as "".
+    """
+    values: list[list[str]]
+    _github_indexes: dict[int, dict[str, int]] = field(
+        default_factory=dict, repr=False, compare=False
+    )
+
+    def value(self, row: int, col: int) -> str:
+        """Value of the cell at (row, col), or "" if it is empty."""
+        if row < 1 or col < 1:
+            return ""
+        try:
+            return self.values[row - 1][col - 1]
+        except IndexError:
+            return ""
+
+    def row_values(self, row: int) -> list[str]:
+        """All values of a row (like Worksheet.row_values)."""
+        if not 1 <= row <= len(self.values):
+            return []
+        return list(self.values[row - 1])
+
+    def col_values(self, col: int) -> list[str]:
+        """All values of a column, "" for rows shorter than col."""
+        return [self.value(row, col) for row in range(1, len(self.values) + 1)]
+
+    def github_index(self, col: int, start_row: int = 3) -> dict[str, int]:
+        """
+        Username -> row index of a GitHub column (see build_github_index).
+
+        Built on first use and kept with the snapshot.
+        """
+        index = self._github_indexes.get(col)
+        if index is None:
+            index = build_github_index(self.col_values(col)[start_row - 1:], start_row)
+            self._github_indexes[col] = index
+        return index
+
+    def find_col(self, query: str) -> int | None:
+        """
+        Column of the first cell equal to query, searching row by row.
+
+        Matches the cell lookup order of Worksheet.find().
+        """
+        for row in self.values:
+            try:
+                return row.index(query) + 1
+            except ValueError:
+                continue
+        return None
+
+
+def fetch_sheet_snapshot(worksheet) -> SheetSnapshot:
+    """
+    Read all values of a worksheet in one request.
+
+    A group worksheet is a few dozen rows, so fetching it whole is cheaper
+    than the separate requests for headers, the GitHub column, the lab
+    column and individual cells that it replaces.
+
+    Args:
+        worksheet: gspread Worksheet object
+
+    Returns:
+        SheetSnapshot with the worksheet values
+    """
+    return SheetSnapshot(worksheet.get_all_values())
+
+
+def _cell_value(worksheet, row: int, col: int) -> str | None:
+    """
+    Read one cell from a SheetSnapshot, or from a gspread Worksheet.
+
+    A Worksheet costs one API request per call.
+    """
+    if isinstance(worksheet, SheetSnapshot):
+        return worksheet.value(row, col)
+    return worksheet.cell(row, col).value
+
+
 def find_student_row(
     github_values: list[str],
     github_username: str,
@@ -63,6 +194,56 @@ def find_student_row(
     return None
 
 
+def build_github_index(
+    github_values: list[str],
+    start_row: int = 3
+) -> dict[str, int]:
+    """
+    Build a case-insensitive username -> row index for a GitHub column.
+
+    For repeated lookups against the same column: the column is lowercased
+    once instead of on every find_student_row call. As in find_student_row,
+    the first occurrence of a username wins.
+
+    Args:
+        github_values: List of GitHub usernames from the column (0-indexed)
+        start_row: First data row number (default 3 = after 2 header rows)
+
+    Returns:
+        Dict mapping lowercased username to 1-based row number
+
+    Examples:
+        >>> build_github_index(["User1", "", "user2"])
+        {'user1': 3, 'user2': 5}
+    """
+    index: dict[str, int] = {}
+    for idx, value in enumerate(github_values):
+        if value:
+            index.setdefault(value.lower(), start_row + idx)
+    return index
+
+
+def find_student_row_indexed(
+    github_index: dict[str, int],
+    github_username: str
+) -> int | None:
+    """
+    Find the row number for a student using a prebuilt index.
+
+    Args:
+        github_index: Index from build_github_index
+        github_username: Username to find
+
+    Returns:
+        1-based row number or None if not found
+
+    Examples:
+        >>> find_student_row_indexed({'user1': 3}, "USER1")
+        3
+    """
+    return github_index.get(github_username.lower())
+
+
 def find_lab_column_by_name(
     worksheet,
     short_name: str
@@ -70,15 +251,18 @@ def find_lab_column_by_name(
     """
     Find lab column by searching for short_name in headers.
 
-    Uses gspread's find() method to locate the cell.
+    Uses gspread's find() method to locate the cell, or searches the
+    snapshot without an API request.
 
     Args:
-        worksheet: gspread Worksheet object
+        worksheet: SheetSnapshot or gspread Worksheet object
         short_name: Lab short name to find (e.g., "ЛР1")
 
     Returns:
         1-based column number or None if not found
     """
+    if isinstance(worksheet, SheetSnapshot):
+        return worksheet.find_col(short_name)
     try:
         cell = worksheet.find(short_name)
         if cell:
@@ -143,19 +327,21 @@ def can_overwrite_cell(current_value: str) -> bool:
         >>> can_overwrite_cell("v-3")
         False
     """
-    if not current_value:
+    # Values without surrounding whitespace (the usual case) need no strip() copy
+    if (
+        not current_value
+        or current_value in OVERWRITABLE_VALUES
+        or current_value.startswith(OVERWRITABLE_PREFIXES)
+    ):
         return True
 
     value_stripped = current_value.strip()
 
-    if value_stripped in OVERWRITABLE_VALUES:
-        return True
-
-    for prefix in OVERWRITABLE_PREFIXES:
-        if value_stripped.startswith(prefix):
-            return True
-
-    return False
+    # str.startswith takes the whole prefix tuple in one call
+    return (
+        value_stripped in OVERWRITABLE_VALUES
+        or value_stripped.startswith(OVERWRITABLE_PREFIXES)
+    )
 
 
 def format_cell_protection_message(current_value: str) -> str:
@@ -221,6 +407,63 @@ def prepare_grade_update(
     )
 
 
+@lru_cache(maxsize=512)
+def _parse_deadline_value(value: str) -> datetime | None:
+    """
+    Parse a deadline cell value in one of the supported formats.
+
+    A course has a few deadlines parsed over and over, so results are
+    cached by the cell value itself: an edited deadline is a new key.
+
+    Args:
+        value: Stripped cell value
+
+    Returns:
+        Naive datetime or None if the value matches no supported format
+    """
+    match = _DEADLINE_RE.fullmatch(value)
+    if match:
+        try:
+            if match['Y']:
+                return datetime(
+                    int(match['Y']), int(match['m']), int(match['d']),
+                    int(match['H'] or 0), int(match['M'] or 0),
+                )
+            return datetime(
+                int(match['iso_Y']), int(match['iso_m']), int(match['iso_d']),
+                int(match['iso_H'] or 0), int(match['iso_M'] or 0), int(match['iso_S'] or 0),
+            )
+        except ValueError:
+            # Out-of-range field, e.g. month 13: strptime rejects it too
+            return None
+
+    for fmt in _DEADLINE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+@lru_cache(maxsize=32)
+def _parse_utc_offset(timezone_str: str) -> timezone | None:
+    """
+    Parse a timezone string like "UTC+3" or "UTC-5".
+
+    Courses use a handful of timezone strings, so results are cached.
+
+    Args:
+        timezone_str: Timezone string from the course config
+
+    Returns:
+        Fixed-offset timezone or None if the string is not recognized
+    """
+    match = _UTC_OFFSET_RE.match(timezone_str)
+    if not match:
+        return None
+    return timezone(timedelta(hours=int(match.group(1))))
+
+
 def get_deadline_from_sheet(
     worksheet,
     lab_col: int,
@@ -233,7 +476,7 @@ def get_deadline_from_sheet(
     Deadline is typically stored in the row above the lab header.
 
     Args:
-        worksheet: gspread Worksheet object
+        worksheet: SheetSnapshot or gspread Worksheet object
         lab_col: 1-based column number of the lab
         deadline_row: Row number containing deadline (default 1)
         timezone_str: Timezone string (e.g., "UTC+3", "UTC-5") to apply if date is naive
@@ -248,33 +491,14 @@ def get_deadline_from_sheet(
         - "YYYY-MM-DDTHH:MM:SS" (ISO format)
         - Dates with timezone info (e.g., "2025-03-15T23:59:59+03:00")
     """
-    from datetime import timezone, timedelta
-    import re
-
     try:
-        cell_value = worksheet.cell(deadline_row, lab_col).value
+        cell_value = _cell_value(worksheet, deadline_row, lab_col)
         if not cell_value:
             return None
 
         cell_value = cell_value.strip()
 
-        # Try different date formats
-        formats = [
-            "%d.%m.%Y %H:%M",      # 15.03.2025 23:59
-            "%d.%m.%Y",             # 15.03.2025
-            "%Y-%m-%d %H:%M:%S",    # 2025-03-15 23:59:59
-            "%Y-%m-%d %H:%M",       # 2025-03-15 23:59
-            "%Y-%m-%d",             # 2025-03-15
-            "%Y-%m-%dT%H:%M:%S",    # ISO format
-        ]
-
-        parsed_dt = None
-        for fmt in formats:
-            try:
-                parsed_dt = datetime.strptime(cell_value, fmt)
-                break
-            except ValueError:
-                continue
+        parsed_dt = _parse_deadline_value(cell_value)
 
         if parsed_dt is None:
             logger.warning(f"Could not parse deadline '{cell_value}' at row {deadline_row}, col {lab_col}")
@@ -294,10 +518,8 @@ def get_deadline_from_sheet(
         # If no timezone and timezone_str provided, apply it
         if timezone_str:
             # Parse timezone string like "UTC+3" or "UTC-5"
-            match = re.match(r'UTC([+-]\d+)', timezone_str)
-            if match:
-                offset_hours = int(match.group(1))
-                tz = timezone(timedelta(hours=offset_hours))
+            tz = _parse_utc_offset(timezone_str)
+            if tz is not None:
                 parsed_dt = parsed_dt.replace(tzinfo=tz)
                 logger.debug(f"Applied timezone {timezone_str} to deadline: {parsed_dt}")
             else:
@@ -318,7 +540,7 @@ def get_student_order(
     Get student's task ID / order number from spreadsheet.
 
     Args:
-        worksheet: gspread Worksheet object
+        worksheet: SheetSnapshot or gspread Worksheet object
         row: Student's row number (1-based)
         task_id_column: Column number containing task IDs (0-based in config, converted to 1-based)
 
@@ -330,7 +552,7 @@ def get_student_order(
         so caller should add 1 before passing to this function.
     """
     try:
-        cell_value = worksheet.cell(row, task_id_column).value
+        cell_value = _cell_value(worksheet, row, task_id_column)
         if not cell_value:
             return None
 
@@ -357,7 +579,15 @@ def get_decimal_separator(spreadsheet) -> str:
         - Locales like en_US, en_GB use '.'
         - Locales like ru_RU, de_DE, fr_FR use ','
         - Defaults to '.' if locale cannot be determined
+        - Cached per spreadsheet id for SEPARATOR_TTL seconds; failed
+          lookups are not cached
     """
+    # Locale rarely changes, and fetching it is a full metadata request
+    spreadsheet_id = getattr(spreadsheet, 'id', None)
+    cached = _SEPARATOR_CACHE.get(spreadsheet_id) if spreadsheet_id else None
+    if cached is not None and time.monotonic() < cached[1]:
+        return cached[0]
+
     try:
         # Get spreadsheet metadata to access locale
         metadata = spreadsheet.fetch_sheet_metadata()
@@ -365,18 +595,15 @@ def get_decimal_separator(spreadsheet) -> str:
 
         logger.debug(f"Spreadsheet locale: {locale}")
 
-        # Locales that use comma as decimal separator
-        comma_locales = {
-            'ru_RU', 'ru', 'de_DE', 'de', 'fr_FR', 'fr', 'es_ES', 'es',
-            'it_IT', 'it', 'pt_BR', 'pt', 'nl_NL', 'nl', 'pl_PL', 'pl',
-            'cs_CZ', 'cs', 'sv_SE', 'sv', 'da_DK', 'da', 'fi_FI', 'fi',
-            'no_NO', 'no', 'tr_TR', 'tr', 'el_GR', 'el', 'hu_HU', 'hu',
-        }
-
-        separator = ',' if locale in comma_locales else '.'
+        separator = ',' if locale in _COMMA_LOCALES else '.'
         logger.info(f"Using decimal separator '{separator}' for locale {locale}")
-        return separator
 
     except Exception as e:
         logger.warning(f"Could not determine spreadsheet locale: {e}. Using default separator '.'")
         return '.'
+
+    if spreadsheet_id:
+        if len(_SEPARATOR_CACHE) >= _SEPARATOR_CACHE_MAX_ENTRIES:
+            _SEPARATOR_CACHE.clear()
+        _SEPARATOR_CACHE[spreadsheet_id] = (separator, time.monotonic() + SEPARATOR_TTL)
+    return separator
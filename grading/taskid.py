@@ -4,8 +4,22 @@ Task ID validation for lab submissions.
 This module contains functions for extracting and validating student
 task IDs (variant numbers) from GitHub Actions logs.
 """
+import logging
 import re
 from dataclasses import dataclass
+from itertools import chain
+from typing import Iterable
+
+logger = logging.getLogger(__name__)
+
+# Pattern: timestamp at line start, then "TASKID is <number>"
+# GitHub Actions timestamp format: "2024-01-15T10:30:00.000Z " or "2024-01-15T10:30:00.1234567Z "
+# Only matches TASKID at the start of line content (after timestamp)
+# Does NOT match "Some text TASKID is 99" in the middle of a line
+TASKID_PATTERN = re.compile(
+    r'^\d{4}-\d{2}-\d{2}T[\d:.]+Z\s+TASKID\s+is\s+(\d+)',
+    re.MULTILINE | re.IGNORECASE,
+)
 
 
 @dataclass
@@ -39,38 +53,90 @@ def extract_taskid_from_logs(logs: str) -> TaskIdResult:
         >>> result.error is None
         True
     """
-    import logging
-    logger = logging.getLogger(__name__)
-
     if not logs:
         return TaskIdResult(found=None, error="Логи пусты")
 
-    # Pattern: timestamp at line start, then "TASKID is <number>"
-    # GitHub Actions timestamp format: "2024-01-15T10:30:00.000Z " or "2024-01-15T10:30:00.1234567Z "
-    # Only matches TASKID at the start of line content (after timestamp)
-    # Does NOT match "Some text TASKID is 99" in the middle of a line
-    pattern = r'^\d{4}-\d{2}-\d{2}T[\d:.]+Z\s+TASKID\s+is\s+(\d+)'
+    result = _taskid_result(m.group(1) for m in TASKID_PATTERN.finditer(logs))
+
+    if result is None:
+        # Check if there are any mentions of "TASKID" (for debugging).
+        # A single str.count scan is enough here - the number is only informational.
+        if logger.isEnabledFor(logging.DEBUG):
+            taskid_mentions = logs.upper().count('TASKID')
+            if taskid_mentions > 0:
+                logger.debug(f"Found {taskid_mentions} mention(s) of TASKID, but none match the required pattern")
+        return TaskIdResult(found=None, error="TASKID не найден в логах")
+
+    return result
+
+
+def extract_taskid_from_lines(lines: Iterable[str]) -> TaskIdResult:
+    """
+    Extract TASKID from GitHub Actions job logs given line by line.
+
+    Same rules as extract_taskid_from_logs, but the log is consumed as an
+    iterable (e.g. a streamed HTTP response), so it never has to be held in
+    memory as a whole. Lines are read until a TASKID different from the
+    first one shows up, so a mismatch later in the log is still reported.
+
+    Args:
+        lines: Log lines, with or without trailing newlines
+
+    Returns:
+        TaskIdResult with found ID or error message
 
-    matches = re.findall(pattern, logs, re.MULTILINE | re.IGNORECASE)
+    Examples:
+        >>> extract_taskid_from_lines(["2024-01-15T10:30:00.000Z TASKID is 15"]).found
+        15
+    """
+    lines = iter(lines)
+    first_line = next(lines, None)
+    if first_line is None:
+        return TaskIdResult(found=None, error="Логи пусты")
 
-    if len(matches) == 0:
-        # Check if there are any lines with "TASKID" (for debugging)
-        taskid_mentions = len([line for line in logs.split('\n') if 'TASKID' in line.upper()])
-        if taskid_mentions > 0:
-            logger.debug(f"Found {taskid_mentions} line(s) mentioning TASKID, but none match the required pattern")
+    matches = map(TASKID_PATTERN.match, chain((first_line,), lines))
+    result = _taskid_result(m.group(1) for m in matches if m)
+    if result is None:
         return TaskIdResult(found=None, error="TASKID не найден в логах")
 
-    # Check all matches are the same (multiple outputs of same TASKID is OK)
-    unique_ids = set(int(m) for m in matches)
-    if len(unique_ids) > 1:
-        logger.warning(f"Multiple different TASKIDs found: {sorted(unique_ids)}")
-        return TaskIdResult(
-            found=None,
-            error=f"Найдено несколько разных TASKID в логах: {sorted(unique_ids)}. Обратитесь к преподавателю."
-        )
+    return result
+
+
+def _taskid_result(matches: Iterable[str]) -> TaskIdResult | None:
+    """
+    Build TaskIdResult from TASKID strings captured from the logs.
 
-    logger.debug(f"TASKID extracted from logs: {int(matches[0])} (found {len(matches)} occurrence(s))")
-    return TaskIdResult(found=int(matches[0]))
+    Stops at the first value that differs from the first one, so the rest
+    of the logs is not scanned once the result is known to be an error.
+
+    Args:
+        matches: TASKID values captured from the logs, lazily
+
+    Returns:
+        TaskIdResult with the ID, or an error if the values differ;
+        None if there were no matches
+    """
+    first = None
+    count = 0
+    for match in matches:
+        value = int(match)
+        if first is None:
+            first = value
+        elif value != first:
+            # Multiple outputs of the same TASKID are OK, different ones are not
+            unique_ids = sorted((first, value))
+            logger.warning(f"Multiple different TASKIDs found: {unique_ids}")
+            return TaskIdResult(
+                found=None,
+                error=f"Найдено несколько разных TASKID в логах: {unique_ids}. Обратитесь к преподавателю."
+            )
+        count += 1
+
+    if first is None:
+        return None
+
+    logger.debug(f"TASKID extracted from logs: {first} (found {count} occurrence(s))")
+    return TaskIdResult(found=first)
 
 
 def calculate_expected_taskid(
@@ -99,12 +165,17 @@ def calculate_expected_taskid(
         9
         >>> calculate_expected_taskid(16, 4, 20)  # (16+4)%20=0 -> 20
         20
+        >>> all(
+        ...     calculate_expected_taskid(o, s, m) == ((o + s) % m or m)
+        ...     for o in range(-5, 45) for s in range(-5, 25) for m in range(1, 21)
+        ... )
+        True
     """
     if taskid_max <= 0:
         raise ValueError(f"taskid_max must be positive, got {taskid_max}")
 
-    result = (student_order + taskid_shift) % taskid_max
-    return result if result != 0 else taskid_max
+    # Shifting into 0..taskid_max-1 and back maps a zero remainder to taskid_max
+    return (student_order + taskid_shift - 1) % taskid_max + 1
 
 
 def validate_taskid(
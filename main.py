@@ -22,7 +22,7 @@ from grading import (
     LabGrader,
     GitHubClient,
     GradeStatus,
-    find_student_row,
+    find_student_row_indexed,
     find_lab_column_by_name,
     calculate_lab_column,
     can_overwrite_cell,
@@ -30,8 +30,12 @@ from grading import (
     get_student_order,
     calculate_expected_taskid,
     get_decimal_separator,
+    fetch_sheet_snapshot,
     format_grade_with_score,
     format_score,
+    calculate_penalty,
+    format_grade_with_penalty,
+    PenaltyStrategy,
 )
 
 # Configure logging to both file and console
@@ -102,6 +106,9 @@ if not GITHUB_TOKEN:
         "GITHUB_TOKEN должен быть установлен в переменных окружения. "
         "Приложение требует доступ к GitHub API."
     )
+
+# Один пул соединений с GitHub API на процесс (клиенты создаются на каждый запрос)
+github_session = GitHubClient.create_session()
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # Разрешить запросы с любых источников
@@ -625,15 +632,16 @@ def grade_lab(request: Request, course_id: str, group_id: str, lab_id: str, grad
             raise HTTPException(status_code=400, detail="Missing course configuration")
 
         # Create grader and do GitHub checks FIRST (before Sheets connection)
-        github_client = GitHubClient(GITHUB_TOKEN)
+        github_client = GitHubClient(GITHUB_TOKEN, session=github_session)
         grader = LabGrader(github_client)
 
         username = grade_request.github
         repo_name = f"{repo_prefix}-{username}"
         logger.info(f"Checking repository: {org}/{repo_name}")
 
-        # Step 1: Check repository (required files, workflows, commits)
-        repo_error = grader.check_repository(org, repo_name, lab_config_dict)
+        # Step 1: Check repository (required files, workflows, commits);
+        # the latest commit is passed on to the next steps
+        repo_error, commit = grader.check_repository(org, repo_name, lab_config_dict)
         if repo_error:
             logger.warning(f"Repository check failed: {repo_error.message}")
             # Use 404 for "no commits" to match original behavior
@@ -641,13 +649,13 @@ def grade_lab(request: Request, course_id: str, group_id: str, lab_id: str, grad
             raise HTTPException(status_code=status_code, detail=repo_error.message)
 
         # Step 2: Check forbidden file modifications
-        forbidden_error = grader.check_forbidden_files(org, repo_name, lab_config_dict)
+        forbidden_error = grader.check_forbidden_files(org, repo_name, lab_config_dict, commit)
         if forbidden_error:
             logger.warning(f"Forbidden modification: {forbidden_error.message}")
             raise HTTPException(status_code=403, detail=forbidden_error.message)
 
         # Step 3: Evaluate CI results
-        ci_evaluation = grader._evaluate_ci_internal(org, repo_name, lab_config_dict)
+        ci_evaluation = grader._evaluate_ci_internal(org, repo_name, lab_config_dict, commit)
 
         # Return early for errors (no Sheets needed)
         if ci_evaluation.grade_result.status == GradeStatus.ERROR:
@@ -682,16 +690,18 @@ def grade_lab(request: Request, course_id: str, group_id: str, lab_id: str, grad
         decimal_separator = get_decimal_separator(spreadsheet)
         logger.info(f"Using decimal separator: '{decimal_separator}'")
 
+        # Read the worksheet once; all lookups below use the in-memory copy
+        snapshot = fetch_sheet_snapshot(sheet)
+
         # Find GitHub column and student row
-        header_row = sheet.row_values(1)
+        header_row = snapshot.row_values(1)
         try:
             github_col_idx = header_row.index("GitHub") + 1
         except ValueError:
             logger.error(f"'GitHub' column not found in spreadsheet headers")
             raise HTTPException(status_code=400, detail="Столбец 'GitHub' не найден")
 
-        github_values = sheet.col_values(github_col_idx)[2:]
-        row_idx = find_student_row(github_values, username)
+        row_idx = find_student_row_indexed(snapshot.github_index(github_col_idx), username)
 
         if row_idx is None:
             logger.warning(f"GitHub username '{username}' not found in spreadsheet for group {group_id}")
@@ -700,7 +710,7 @@ def grade_lab(request: Request, course_id: str, group_id: str, lab_id: str, grad
         # Find lab column
         lab_short_name = lab_config_dict.get("short-name")
         if lab_short_name:
-            lab_col = find_lab_column_by_name(sheet, lab_short_name)
+            lab_col = find_lab_column_by_name(snapshot, lab_short_name)
             if lab_col:
                 logger.info(f"Found lab column '{lab_short_name}' at column {lab_col}")
             else:
@@ -713,7 +723,7 @@ def grade_lab(request: Request, course_id: str, group_id: str, lab_id: str, grad
             logger.info(f"Calculated lab column using offset: {lab_offset} + {lab_number} = {lab_col}")
 
         # Get current cell value for protection check
-        current_value = sheet.cell(row_idx, lab_col).value or ""
+        current_value = snapshot.value(row_idx, lab_col)
         logger.info(f"Current cell value at row {row_idx}, column {lab_col}: '{current_value}'")
 
         # Determine final grade
@@ -730,7 +740,7 @@ def grade_lab(request: Request, course_id: str, group_id: str, lab_id: str, grad
 
             if task_id_column_config is not None and taskid_max is not None and not ignore_taskid:
                 task_id_column = task_id_column_config + 1
-                student_order = get_student_order(sheet, row_idx, task_id_column)
+                student_order = get_student_order(snapshot, row_idx, task_id_column)
 
                 if student_order is not None:
                     taskid_shift = lab_config_dict.get("taskid-shift", 0)
@@ -749,10 +759,9 @@ def grade_lab(request: Request, course_id: str, group_id: str, lab_id: str, grad
             # Calculate penalty if deadline configured
             # Get timezone from course config to apply to deadline from sheet
             timezone_str = course_info.get("timezone")
-            deadline = get_deadline_from_sheet(sheet, lab_col, deadline_row=1, timezone_str=timezone_str)
+            deadline = get_deadline_from_sheet(snapshot, lab_col, deadline_row=1, timezone_str=timezone_str)
             penalty = 0
             if deadline and ci_evaluation.latest_success_time:
-                from grading.penalty import calculate_penalty, format_grade_with_penalty, PenaltyStrategy
                 penalty_max = lab_config_dict.get("penalty-max", 0)
                 strategy_name = lab_config_dict.get("penalty-strategy", "weekly")
                 try:
@@ -784,7 +793,6 @@ def grade_lab(request: Request, course_id: str, group_id: str, lab_id: str, grad
                     final_message = f"Результат CI: ✅ Все проверки пройдены (Баллы: {formatted_score})"
             elif penalty > 0:
                 # No score, but penalty exists
-                from grading.penalty import format_grade_with_penalty
                 final_result = format_grade_with_penalty("v", penalty)
                 final_message = f"Результат CI: ✅ Все проверки пройдены (штраф: -{penalty})"
                 logger.info(f"Applied penalty {penalty} for late submission: {final_result}")
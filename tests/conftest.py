@@ -19,6 +19,21 @@ def mock_env_vars(monkeypatch):
     monkeypatch.setenv("SECRET_KEY", "test_secret_key")
 
 
+@pytest.fixture(autouse=True)
+def clear_github_cache():
+    """Start every test with empty GitHub response, validation and locale caches."""
+    from grading.github_client import clear_cache
+    from grading.grader import clear_validation_cache
+    from grading.sheets_client import clear_separator_cache
+    clear_cache()
+    clear_validation_cache()
+    clear_separator_cache()
+    yield
+    clear_cache()
+    clear_validation_cache()
+    clear_separator_cache()
+
+
 @pytest.fixture(autouse=True)
 def disable_rate_limiting(request):
     """Disable rate limiting in tests by patching the limiter.
@@ -113,6 +128,12 @@ def mock_gspread():
         mock_worksheet.row_values.return_value = ["№", "ФИО", "GitHub", "ЛР1", "ЛР2"]
         mock_worksheet.col_values.return_value = ["", "", "student1", "student2"]
         mock_worksheet.cell.return_value = MagicMock(value="")
+        mock_worksheet.get_all_values.return_value = [
+            ["№", "ФИО", "GitHub", "ЛР1", "ЛР2"],
+            ["", "", "", "", ""],
+            ["1", "Student One", "student1", "", ""],
+            ["2", "Student Two", "student2", "", ""],
+        ]
 
         yield {
             'gspread': mock_gs,
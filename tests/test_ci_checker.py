@@ -64,6 +64,28 @@ class TestParseCheckRuns:
         assert result[0].conclusion is None
         assert result[0].html_url == ""
 
+    def test_parse_completed_at_utc(self):
+        """Trailing 'Z' in completed_at is parsed as UTC."""
+        data = [{"name": "test", "completed_at": "2024-01-15T10:00:00Z"}]
+        result = parse_check_runs(data)
+        assert result[0].completed_at == datetime(2024, 1, 15, 10, 0, tzinfo=timezone.utc)
+
+    def test_job_id_from_url(self):
+        """Job ID is parsed from the check run URL."""
+        data = [
+            {"name": "a", "html_url": "https://github.com/o/r/actions/runs/1/job/12345"},
+            {"name": "b", "html_url": "https://github.com/o/r/actions/runs/1/job/678?pr=2"},
+            {"name": "c", "html_url": "https://github.com/o/r/runs/1"},
+        ]
+        result = parse_check_runs(data)
+        assert [r.job_id for r in result] == [12345, 678, None]
+
+    def test_parse_invalid_completed_at(self):
+        """Unparseable completed_at is ignored."""
+        data = [{"name": "test", "completed_at": "not a date"}]
+        result = parse_check_runs(data)
+        assert result[0].completed_at is None
+
 
 class TestFilterRelevantJobs:
     """Tests for filter_relevant_jobs function."""
@@ -180,6 +202,16 @@ class TestEvaluateCIResults:
         assert result.total_count == 0
         assert result.has_pending is True
 
+    def test_successful_runs_collected(self):
+        """Successful runs are returned in input order."""
+        runs = [
+            CheckRun("test", "success", "url1"),
+            CheckRun("lint", "failure", "url2"),
+            CheckRun("build", "success", "url3"),
+        ]
+        result = evaluate_ci_results(runs)
+        assert [r.name for r in result.successful_runs] == ["test", "build"]
+
     def test_latest_success_time(self):
         """Track latest success time."""
         runs = [
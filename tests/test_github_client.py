@@ -6,6 +6,7 @@ Tests GitHub API client with mocked HTTP responses.
 import pytest
 import responses
 import sys
+from unittest.mock import MagicMock, patch
 import os
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -13,11 +14,190 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from grading.github_client import (
     GitHubClient,
     CommitInfo,
+    _RESPONSE_CACHE,
+    clear_cache,
     check_forbidden_modifications,
     get_default_forbidden_patterns,
 )
 
 
+class TestGitHubClientSession:
+    """Tests for HTTP session handling."""
+
+    @responses.activate
+    def test_auth_headers_sent(self):
+        """Auth headers are applied to every request."""
+        responses.add(
+            responses.GET,
+            "https://api.github.com/users/testuser",
+            json={"login": "testuser"},
+            status=200
+        )
+        client = GitHubClient("test_token")
+        client.user_exists("testuser")
+        assert responses.calls[0].request.headers["Authorization"] == "Bearer test_token"
+
+    @responses.activate
+    def test_shared_session(self):
+        """Clients sharing a session send their own token and don't close it."""
+        responses.add(
+            responses.GET,
+            "https://api.github.com/users/testuser",
+            json={"login": "testuser"},
+            status=200
+        )
+        session = GitHubClient.create_session()
+        with GitHubClient("token_a", session=session) as client:
+            client.user_exists("testuser")
+        clear_cache()
+        GitHubClient("token_b", session=session).user_exists("testuser")
+
+        assert responses.calls[0].request.headers["Authorization"] == "Bearer token_a"
+        assert responses.calls[1].request.headers["Authorization"] == "Bearer token_b"
+        assert responses.calls[0].request.headers["User-Agent"] == GitHubClient.USER_AGENT
+        assert "Authorization" not in session.headers
+
+    def test_context_manager_closes_session(self):
+        """Leaving the with-block closes the session."""
+        with GitHubClient("test_token") as client:
+            client.session = MagicMock()
+        client.session.close.assert_called_once()
+
+
+class TestGitHubClientResponseCache:
+    """Tests for the shared GET response cache."""
+
+    @responses.activate
+    def test_user_lookup_served_from_cache(self):
+        """Repeated user lookups within the TTL make one request."""
+        responses.add(
+            responses.GET,
+            "https://api.github.com/users/cached",
+            json={"login": "cached"},
+            status=200
+        )
+        assert GitHubClient("test_token").user_exists("cached") is True
+        assert GitHubClient("test_token").user_exists("cached") is True
+        assert len(responses.calls) == 1
+
+    @responses.activate
+    def test_etag_revalidation(self):
+        """Stale entries are revalidated and a 304 reuses the cached body."""
+        url = "https://api.github.com/repos/org/repo/commits/abc123/check-runs"
+        responses.add(
+            responses.GET, url,
+            json={"check_runs": [{"name": "test"}]},
+            headers={"ETag": '"v1"'},
+            status=200
+        )
+        responses.add(responses.GET, url, status=304)
+
+        client = GitHubClient("test_token")
+        client.CHECK_RUNS_TTL = 0
+        assert client.get_check_runs("org", "repo", "abc123") == [{"name": "test"}]
+        assert client.get_check_runs("org", "repo", "abc123") == [{"name": "test"}]
+        assert responses.calls[1].request.headers["If-None-Match"] == '"v1"'
+
+    @responses.activate
+    def test_errors_not_cached(self):
+        """Non-200 responses are always re-requested."""
+        responses.add(
+            responses.GET,
+            "https://api.github.com/users/flaky",
+            status=404
+        )
+        client = GitHubClient("test_token")
+        client.user_exists("flaky")
+        client.user_exists("flaky")
+        assert len(responses.calls) == 2
+
+    @responses.activate
+    def test_clear_cache(self):
+        """clear_cache forces a fresh request."""
+        responses.add(
+            responses.GET,
+            "https://api.github.com/users/cached",
+            json={"login": "cached"},
+            status=200
+        )
+        client = GitHubClient("test_token")
+        client.user_exists("cached")
+        clear_cache()
+        client.user_exists("cached")
+        assert len(responses.calls) == 2
+
+
+class TestGitHubClientRateLimit:
+    """Tests for rate limit handling."""
+
+    @responses.activate
+    def test_retry_after_is_honored(self):
+        """A secondary rate limit reply is retried after Retry-After seconds."""
+        url = "https://api.github.com/users/testuser"
+        responses.add(responses.GET, url, status=403, headers={"Retry-After": "2"})
+        responses.add(responses.GET, url, json={"login": "testuser"}, status=200)
+
+        with patch("grading.github_client.time.sleep") as sleep:
+            assert GitHubClient("test_token").user_exists("testuser") is True
+        sleep.assert_called_once_with(2.0)
+
+    @responses.activate
+    def test_long_wait_not_retried(self):
+        """Waits above MAX_RATE_LIMIT_WAIT return the limited response."""
+        responses.add(
+            responses.GET,
+            "https://api.github.com/users/testuser",
+            status=403,
+            headers={"Retry-After": "3600"}
+        )
+        with patch("grading.github_client.time.sleep") as sleep:
+            assert GitHubClient("test_token").user_exists("testuser") is False
+        sleep.assert_not_called()
+
+    @responses.activate
+    def test_total_wait_is_limited(self):
+        """Waits of one call stop adding up at MAX_RATE_LIMIT_WAIT."""
+        url = "https://api.github.com/users/testuser"
+        responses.add(responses.GET, url, status=403, headers={"Retry-After": "3"})
+
+        with patch("grading.github_client.time.sleep") as sleep:
+            assert GitHubClient("test_token").user_exists("testuser") is False
+        sleep.assert_called_once_with(3.0)
+        assert len(responses.calls) == 2
+
+    @responses.activate
+    def test_retries_are_limited(self):
+        """No more than RATE_LIMIT_RETRIES retries are made."""
+        url = "https://api.github.com/users/testuser"
+        responses.add(responses.GET, url, status=403, headers={"Retry-After": "0"})
+
+        with patch("grading.github_client.time.sleep"):
+            assert GitHubClient("test_token").user_exists("testuser") is False
+        assert len(responses.calls) == GitHubClient.RATE_LIMIT_RETRIES + 1
+
+    def test_limited_response_closed_before_retry(self):
+        """A rate-limited (possibly streamed) response is closed before the wait."""
+        limited = MagicMock(status_code=429, headers={"Retry-After": "1"})
+        ok = MagicMock(status_code=200, headers={})
+        session = MagicMock()
+        session.request.side_effect = [limited, ok]
+
+        with patch("grading.github_client.time.sleep"):
+            resp = GitHubClient("test_token", session=session)._request("https://example.test", stream=True)
+        assert resp is ok
+        limited.close.assert_called_once()
+        ok.close.assert_not_called()
+
+    @responses.activate
+    def test_plain_forbidden_not_retried(self):
+        """403 without rate limit headers is not retried."""
+        responses.add(responses.GET, "https://api.github.com/users/testuser", status=403)
+        with patch("grading.github_client.time.sleep") as sleep:
+            assert GitHubClient("test_token").user_exists("testuser") is False
+        sleep.assert_not_called()
+        assert len(responses.calls) == 1
+
+
 class TestGitHubClientUserExists:
     """Tests for user_exists method."""
 
@@ -53,9 +233,8 @@ class TestGitHubClientFileExists:
     def test_file_exists(self):
         """Existing file returns True."""
         responses.add(
-            responses.GET,
+            responses.HEAD,
             "https://api.github.com/repos/org/repo/contents/test.py",
-            json={"name": "test.py"},
             status=200
         )
         client = GitHubClient("test_token")
@@ -65,9 +244,8 @@ class TestGitHubClientFileExists:
     def test_file_not_exists(self):
         """Non-existent file returns False."""
         responses.add(
-            responses.GET,
+            responses.HEAD,
             "https://api.github.com/repos/org/repo/contents/missing.py",
-            json={"message": "Not Found"},
             status=404
         )
         client = GitHubClient("test_token")
@@ -77,19 +255,98 @@ class TestGitHubClientFileExists:
 class TestGitHubClientCheckRequiredFiles:
     """Tests for check_required_files method."""
 
+    @responses.activate
+    def test_files_checked_against_tree(self):
+        """Required files are looked up in the HEAD tree with one request."""
+        responses.add(
+            responses.GET,
+            "https://api.github.com/repos/org/repo/git/trees/HEAD",
+            json={"tree": [
+                {"path": "main.py", "type": "blob"},
+                {"path": "src", "type": "tree"},
+                {"path": "src/lab.cpp", "type": "blob"},
+            ], "truncated": False},
+            status=200
+        )
+        client = GitHubClient("test_token")
+        missing = client.check_required_files(
+            "org", "repo", ["main.py", "src/lab.cpp", "src/", "report.pdf"]
+        )
+        assert missing == ["report.pdf"]
+        assert len(responses.calls) == 1
+        assert "recursive=1" in responses.calls[0].request.url
+
+    @responses.activate
+    def test_tree_cached_as_paths_only(self):
+        """Only the paths of the tree are kept in the response cache."""
+        responses.add(
+            responses.GET,
+            "https://api.github.com/repos/org/repo/git/trees/HEAD",
+            json={"tree": [
+                {"path": "main.py", "mode": "100644", "type": "blob", "sha": "a1", "size": 10, "url": "u1"},
+                {"path": "src", "mode": "040000", "type": "tree", "sha": "b2", "url": "u2"},
+            ], "truncated": False},
+            headers={"ETag": '"tree-etag"'},
+            status=200
+        )
+        GitHubClient("test_token").check_required_files("org", "repo", ["main.py"])
+
+        bodies = [body for _, _, body in _RESPONSE_CACHE.values()]
+        assert bodies == [["main.py", "src"]]
+
+    @responses.activate
+    def test_truncated_tree_not_cached(self):
+        """Entries of a truncated tree are not kept in the response cache."""
+        responses.add(
+            responses.GET,
+            "https://api.github.com/repos/org/repo/git/trees/HEAD",
+            json={"tree": [{"path": "main.py", "type": "blob"}], "truncated": True},
+            headers={"ETag": '"tree-etag"'},
+            status=200
+        )
+        responses.add(
+            responses.HEAD,
+            "https://api.github.com/repos/org/repo/contents/main.py",
+            status=200
+        )
+        GitHubClient("test_token").check_required_files("org", "repo", ["main.py"])
+
+        assert [body for _, _, body in _RESPONSE_CACHE.values()] == [None]
+
+    @responses.activate
+    def test_truncated_tree_falls_back_to_contents(self):
+        """Truncated tree is not trusted; paths are probed individually."""
+        responses.add(
+            responses.GET,
+            "https://api.github.com/repos/org/repo/git/trees/HEAD",
+            json={"tree": [], "truncated": True},
+            status=200
+        )
+        responses.add(
+            responses.HEAD,
+            "https://api.github.com/repos/org/repo/contents/main.py",
+            status=200
+        )
+        client = GitHubClient("test_token")
+        assert client.check_required_files("org", "repo", ["main.py"]) == []
+
     @responses.activate
     def test_all_files_exist(self):
         """All required files exist returns empty list."""
         responses.add(
             responses.GET,
+            "https://api.github.com/repos/org/repo/git/trees/HEAD",
+            json={"message": "Not Found"},
+            status=404
+        )
+        responses.add(
+            responses.HEAD,
             "https://api.github.com/repos/org/repo/contents/file1.py",
-            json={"name": "file1.py"},
             status=200
         )
         responses.add(
-            responses.GET,
+            responses.HEAD,
             "https://api.github.com/repos/org/repo/contents/file2.py",
-            json={"name": "file2.py"},
             status=200
         )
         client = GitHubClient("test_token")
@@ -101,20 +358,44 @@ class TestGitHubClientCheckRequiredFiles:
         """Missing files returned in list."""
         responses.add(
             responses.GET,
+            "https://api.github.com/repos/org/repo/git/trees/HEAD",
+            json={"message": "Not Found"},
+            status=404
+        )
+        responses.add(
+            responses.HEAD,
             "https://api.github.com/repos/org/repo/contents/exists.py",
-            json={"name": "exists.py"},
             status=200
         )
         responses.add(
-            responses.GET,
+            responses.HEAD,
             "https://api.github.com/repos/org/repo/contents/missing.py",
-            json={"message": "Not Found"},
             status=404
         )
         client = GitHubClient("test_token")
         missing = client.check_required_files("org", "repo", ["exists.py", "missing.py"])
         assert missing == ["missing.py"]
 
+    @responses.activate
+    def test_missing_files_keep_config_order(self):
+        """Missing files are reported in config order even when checked concurrently."""
+        responses.add(
+            responses.GET,
+            "https://api.github.com/repos/org/repo/git/trees/HEAD",
+            json={"message": "Not Found"},
+            status=404
+        )
+        files = [f"file{i}.py" for i in range(10)]
+        for i, name in enumerate(files):
+            responses.add(
+                responses.HEAD,
+                f"https://api.github.com/repos/org/repo/contents/{name}",
+                status=404 if i % 3 == 0 else 200
+            )
+        client = GitHubClient("test_token")
+        missing = client.check_required_files("org", "repo", files)
+        assert missing == ["file0.py", "file3.py", "file6.py", "file9.py"]
+
     @responses.activate
     def test_empty_required_files(self):
         """Empty required files list returns empty."""
@@ -126,13 +407,49 @@ class TestGitHubClientCheckRequiredFiles:
 class TestGitHubClientHasWorkflows:
     """Tests for has_workflows_directory method."""
 
+    @responses.activate
+    def test_tree_fetched_once_per_repo(self):
+        """Workflows check reuses the tree fetched for required files."""
+        responses.add(
+            responses.GET,
+            "https://api.github.com/repos/org/repo/git/trees/HEAD",
+            json={"tree": [
+                {"path": ".github", "type": "tree"},
+                {"path": ".github/workflows", "type": "tree"},
+                {"path": ".github/workflows/ci.yml", "type": "blob"},
+                {"path": "main.py", "type": "blob"},
+            ], "truncated": False},
+            status=200
+        )
+        client = GitHubClient("test_token")
+        assert client.check_required_files("org", "repo", ["main.py"]) == []
+        assert client.has_workflows_directory("org", "repo") is True
+        assert len(responses.calls) == 1
+
+    @responses.activate
+    def test_no_workflows_in_tree(self):
+        """Tree without .github/workflows means no workflows."""
+        responses.add(
+            responses.GET,
+            "https://api.github.com/repos/org/repo/git/trees/HEAD",
+            json={"tree": [{"path": "main.py", "type": "blob"}], "truncated": False},
+            status=200
+        )
+        client = GitHubClient("test_token")
+        assert client.has_workflows_directory("org", "repo") is False
+
     @responses.activate
     def test_has_workflows(self):
         """Workflows directory exists."""
         responses.add(
             responses.GET,
+            "https://api.github.com/repos/org/repo/git/trees/HEAD",
+            json={"message": "Not Found"},
+            status=404
+        )
+        responses.add(
+            responses.HEAD,
             "https://api.github.com/repos/org/repo/contents/.github/workflows",
-            json=[{"name": "test.yml"}],
             status=200
         )
         client = GitHubClient("test_token")
@@ -143,10 +460,15 @@ class TestGitHubClientHasWorkflows:
         """Workflows directory missing."""
         responses.add(
             responses.GET,
-            "https://api.github.com/repos/org/repo/contents/.github/workflows",
+            "https://api.github.com/repos/org/repo/git/trees/HEAD",
             json={"message": "Not Found"},
             status=404
         )
+        responses.add(
+            responses.HEAD,
+            "https://api.github.com/repos/org/repo/contents/.github/workflows",
+            status=404
+        )
         client = GitHubClient("test_token")
         assert client.has_workflows_directory("org", "repo") is False
 
@@ -181,6 +503,54 @@ class TestGitHubClientGetLatestCommit:
         assert commit.sha == "abc123"
         assert len(commit.files) == 1
         assert commit.files[0]["filename"] == "main.py"
+        assert "per_page=1" in responses.calls[0].request.url
+
+    @responses.activate
+    def test_commit_patches_not_kept(self):
+        """Only filename and status of commit files are returned and cached."""
+        responses.add(
+            responses.GET,
+            "https://api.github.com/repos/org/repo/commits",
+            json=[{"sha": "abc123"}],
+            status=200
+        )
+        responses.add(
+            responses.GET,
+            "https://api.github.com/repos/org/repo/commits/abc123",
+            json={
+                "sha": "abc123",
+                "files": [{"filename": "main.py", "status": "added", "patch": "+" * 1000}],
+            },
+            status=200
+        )
+        client = GitHubClient("test_token")
+        client.get_latest_commit("org", "repo")
+        commit = client.get_latest_commit("org", "repo")
+
+        assert commit.files == [{"filename": "main.py", "status": "added"}]
+        assert len(responses.calls) == 2
+
+    @responses.activate
+    def test_repeated_lookup_within_grading_run_is_cached(self):
+        """A second lookup right after the first makes no requests."""
+        responses.add(
+            responses.GET,
+            "https://api.github.com/repos/org/repo/commits",
+            json=[{"sha": "abc123"}],
+            status=200
+        )
+        responses.add(
+            responses.GET,
+            "https://api.github.com/repos/org/repo/commits/abc123",
+            json={"sha": "abc123", "files": []},
+            status=200
+        )
+        client = GitHubClient("test_token")
+        client.get_latest_commit("org", "repo")
+        commit = client.get_latest_commit("org", "repo")
+
+        assert commit.sha == "abc123"
+        assert len(responses.calls) == 2
 
     @responses.activate
     def test_no_commits(self):
@@ -233,6 +603,27 @@ class TestGitHubClientGetCheckRuns:
         assert len(runs) == 2
         assert runs[0]["name"] == "test"
 
+    @responses.activate
+    def test_check_runs_paginated_by_total_count(self):
+        """Further pages are fetched only until total_count runs are seen."""
+        url = "https://api.github.com/repos/org/repo/commits/abc123/check-runs"
+        responses.add(
+            responses.GET, url,
+            json={"total_count": 3, "check_runs": [{"name": "a"}, {"name": "b"}]},
+            status=200
+        )
+        responses.add(
+            responses.GET, url,
+            json={"total_count": 3, "check_runs": [{"name": "c"}]},
+            status=200
+        )
+        client = GitHubClient("test_token")
+        runs = client.get_check_runs("org", "repo", "abc123")
+
+        assert [r["name"] for r in runs] == ["a", "b", "c"]
+        assert len(responses.calls) == 2
+        assert "page=2" in responses.calls[1].request.url
+
     @responses.activate
     def test_check_runs_api_error(self):
         """API error returns None."""
@@ -260,6 +651,33 @@ class TestGitHubClientGetCheckRuns:
         assert runs == []
 
 
+class TestGitHubClientJobLogs:
+    """Tests for job log retrieval."""
+
+    LOGS_URL = "https://api.github.com/repos/org/repo/actions/jobs/42/logs"
+
+    @responses.activate
+    def test_get_job_logs_utf8(self):
+        """Logs are decoded as UTF-8 regardless of headers."""
+        responses.add(responses.GET, self.LOGS_URL, body="Тест пройден\n".encode("utf-8"), status=200)
+        client = GitHubClient("test_token")
+        assert client.get_job_logs("org", "repo", 42) == "Тест пройден\n"
+
+    @responses.activate
+    def test_get_job_logs_stream(self):
+        """Streamed logs are yielded line by line."""
+        responses.add(responses.GET, self.LOGS_URL, body="TASKID is 5\nВсе тесты\n".encode("utf-8"), status=200)
+        client = GitHubClient("test_token")
+        assert list(client.get_job_logs_stream("org", "repo", 42)) == ["TASKID is 5", "Все тесты"]
+
+    @responses.activate
+    def test_get_job_logs_stream_not_found(self):
+        """Unavailable logs return None."""
+        responses.add(responses.GET, self.LOGS_URL, status=404)
+        client = GitHubClient("test_token")
+        assert client.get_job_logs_stream("org", "repo", 42) is None
+
+
 class TestCheckForbiddenModifications:
     """Tests for check_forbidden_modifications function."""
 
@@ -47,14 +47,18 @@ class TestGradeLabCharacterization:
         # Mock GitHub API calls
         responses.add(
             responses.GET,
+            f"https://api.github.com/repos/{org}/{repo_name}/git/trees/HEAD",
+            json={"message": "Not Found"},
+            status=404
+        )
+        responses.add(
+            responses.HEAD,
             f"https://api.github.com/repos/{org}/{repo_name}/contents/test_main.py",
-            json={"name": "test_main.py"},
             status=200
         )
         responses.add(
-            responses.GET,
+            responses.HEAD,
             f"https://api.github.com/repos/{org}/{repo_name}/contents/.github/workflows",
-            json=[{"name": "test.yml"}],
             status=200
         )
         responses.add(
@@ -81,8 +85,11 @@ class TestGradeLabCharacterization:
         )
 
         # Setup worksheet mock
-        mock_gspread['worksheet'].row_values.return_value = ["№", "ФИО", "GitHub", "ЛР1"]
-        mock_gspread['worksheet'].col_values.return_value = ["", "", "testuser"]
+        mock_gspread['worksheet'].get_all_values.return_value = [
+            ["№", "ФИО", "GitHub", "ЛР1"],
+            ["", "", "", ""],
+            ["1", "Test User", "testuser", ""],
+        ]
 
         # Import and call
         from main import grade_lab, GradeRequest
@@ -92,7 +99,10 @@ class TestGradeLabCharacterization:
         assert result["status"] == "updated"
         assert result["result"] == "v"
         assert "1/1" in result["passed"]
-        mock_gspread['worksheet'].update_cell.assert_called_once()
+        mock_gspread['worksheet'].update_cell.assert_called_once_with(3, 4, "v")
+        # All reads come from a single snapshot of the worksheet
+        mock_gspread['worksheet'].get_all_values.assert_called_once()
+        mock_gspread['worksheet'].cell.assert_not_called()
 
     @responses.activate
     def test_failure_some_checks_fail(
@@ -110,14 +120,18 @@ class TestGradeLabCharacterization:
         # Mock GitHub API calls
         responses.add(
             responses.GET,
+            f"https://api.github.com/repos/{org}/{repo_name}/git/trees/HEAD",
+            json={"message": "Not Found"},
+            status=404
+        )
+        responses.add(
+            responses.HEAD,
             f"https://api.github.com/repos/{org}/{repo_name}/contents/test_main.py",
-            json={"name": "test_main.py"},
             status=200
         )
         responses.add(
-            responses.GET,
+            responses.HEAD,
             f"https://api.github.com/repos/{org}/{repo_name}/contents/.github/workflows",
-            json=[{"name": "test.yml"}],
             status=200
         )
         responses.add(
@@ -145,8 +159,11 @@ class TestGradeLabCharacterization:
             status=200
         )
 
-        mock_gspread['worksheet'].row_values.return_value = ["№", "ФИО", "GitHub", "ЛР1"]
-        mock_gspread['worksheet'].col_values.return_value = ["", "", "testuser"]
+        mock_gspread['worksheet'].get_all_values.return_value = [
+            ["№", "ФИО", "GitHub", "ЛР1"],
+            ["", "", "", ""],
+            ["1", "Test User", "testuser", ""],
+        ]
 
         from main import grade_lab, GradeRequest
         grade_request = GradeRequest(github="testuser")
@@ -169,10 +186,15 @@ class TestGradeLabCharacterization:
 
         responses.add(
             responses.GET,
-            f"https://api.github.com/repos/{org}/{repo_name}/contents/test_main.py",
+            f"https://api.github.com/repos/{org}/{repo_name}/git/trees/HEAD",
             json={"message": "Not Found"},
             status=404
         )
+        responses.add(
+            responses.HEAD,
+            f"https://api.github.com/repos/{org}/{repo_name}/contents/test_main.py",
+            status=404
+        )
 
         from main import grade_lab, GradeRequest
         from fastapi import HTTPException
@@ -197,14 +219,18 @@ class TestGradeLabCharacterization:
 
         responses.add(
             responses.GET,
+            f"https://api.github.com/repos/{org}/{repo_name}/git/trees/HEAD",
+            json={"message": "Not Found"},
+            status=404
+        )
+        responses.add(
+            responses.HEAD,
             f"https://api.github.com/repos/{org}/{repo_name}/contents/test_main.py",
-            json={"name": "test_main.py"},
             status=200
         )
         responses.add(
-            responses.GET,
+            responses.HEAD,
             f"https://api.github.com/repos/{org}/{repo_name}/contents/.github/workflows",
-            json={"message": "Not Found"},
             status=404
         )
 
@@ -231,14 +257,18 @@ class TestGradeLabCharacterization:
 
         responses.add(
             responses.GET,
+            f"https://api.github.com/repos/{org}/{repo_name}/git/trees/HEAD",
+            json={"message": "Not Found"},
+            status=404
+        )
+        responses.add(
+            responses.HEAD,
             f"https://api.github.com/repos/{org}/{repo_name}/contents/test_main.py",
-            json={"name": "test_main.py"},
             status=200
         )
         responses.add(
-            responses.GET,
+            responses.HEAD,
             f"https://api.github.com/repos/{org}/{repo_name}/contents/.github/workflows",
-            json=[{"name": "test.yml"}],
             status=200
         )
         responses.add(
@@ -271,14 +301,18 @@ class TestGradeLabCharacterization:
 
         responses.add(
             responses.GET,
+            f"https://api.github.com/repos/{org}/{repo_name}/git/trees/HEAD",
+            json={"message": "Not Found"},
+            status=404
+        )
+        responses.add(
+            responses.HEAD,
             f"https://api.github.com/repos/{org}/{repo_name}/contents/test_main.py",
-            json={"name": "test_main.py"},
             status=200
         )
         responses.add(
-            responses.GET,
+            responses.HEAD,
             f"https://api.github.com/repos/{org}/{repo_name}/contents/.github/workflows",
-            json=[{"name": "test.yml"}],
             status=200
         )
         responses.add(
@@ -320,14 +354,18 @@ class TestGradeLabCharacterization:
 
         responses.add(
             responses.GET,
+            f"https://api.github.com/repos/{org}/{repo_name}/git/trees/HEAD",
+            json={"message": "Not Found"},
+            status=404
+        )
+        responses.add(
+            responses.HEAD,
             f"https://api.github.com/repos/{org}/{repo_name}/contents/test_main.py",
-            json={"name": "test_main.py"},
             status=200
         )
         responses.add(
-            responses.GET,
+            responses.HEAD,
             f"https://api.github.com/repos/{org}/{repo_name}/contents/.github/workflows",
-            json=[{"name": "test.yml"}],
             status=200
         )
         responses.add(
@@ -369,14 +407,18 @@ class TestGradeLabCharacterization:
 
         responses.add(
             responses.GET,
+            f"https://api.github.com/repos/{org}/{repo_name}/git/trees/HEAD",
+            json={"message": "Not Found"},
+            status=404
+        )
+        responses.add(
+            responses.HEAD,
             f"https://api.github.com/repos/{org}/{repo_name}/contents/test_main.py",
-            json={"name": "test_main.py"},
             status=200
         )
         responses.add(
-            responses.GET,
+            responses.HEAD,
             f"https://api.github.com/repos/{org}/{repo_name}/contents/.github/workflows",
-            json=[{"name": "test.yml"}],
             status=200
         )
         responses.add(
@@ -421,14 +463,18 @@ class TestGradeLabCharacterization:
         # Mock all GitHub calls to succeed
         responses.add(
             responses.GET,
+            f"https://api.github.com/repos/{org}/{repo_name}/git/trees/HEAD",
+            json={"message": "Not Found"},
+            status=404
+        )
+        responses.add(
+            responses.HEAD,
             f"https://api.github.com/repos/{org}/{repo_name}/contents/test_main.py",
-            json={"name": "test_main.py"},
             status=200
         )
         responses.add(
-            responses.GET,
+            responses.HEAD,
             f"https://api.github.com/repos/{org}/{repo_name}/contents/.github/workflows",
-            json=[{"name": "test.yml"}],
             status=200
         )
         responses.add(
@@ -451,8 +497,11 @@ class TestGradeLabCharacterization:
         )
 
         # User not in spreadsheet
-        mock_gspread['worksheet'].row_values.return_value = ["№", "ФИО", "GitHub", "ЛР1"]
-        mock_gspread['worksheet'].col_values.return_value = ["", "", "other_user"]
+        mock_gspread['worksheet'].get_all_values.return_value = [
+            ["№", "ФИО", "GitHub", "ЛР1"],
+            ["", "", "", ""],
+            ["1", "Other User", "other_user", ""],
+        ]
 
         from main import grade_lab, GradeRequest
         from fastapi import HTTPException
@@ -505,15 +554,19 @@ class TestGradeLabResponseFormat:
             repo_name = "test-task1-testuser"
 
             # Setup all mocks
-            responses.add(responses.GET, f"https://api.github.com/repos/{org}/{repo_name}/contents/test_main.py", json={}, status=200)
-            responses.add(responses.GET, f"https://api.github.com/repos/{org}/{repo_name}/contents/.github/workflows", json=[], status=200)
+            responses.add(responses.GET, f"https://api.github.com/repos/{org}/{repo_name}/git/trees/HEAD", json={"message": "Not Found"}, status=404)
+            responses.add(responses.HEAD, f"https://api.github.com/repos/{org}/{repo_name}/contents/test_main.py", status=200)
+            responses.add(responses.HEAD, f"https://api.github.com/repos/{org}/{repo_name}/contents/.github/workflows", status=200)
             responses.add(responses.GET, f"https://api.github.com/repos/{org}/{repo_name}/commits", json=[{"sha": "abc"}], status=200)
             responses.add(responses.GET, f"https://api.github.com/repos/{org}/{repo_name}/commits/abc", json={"files": []}, status=200)
             responses.add(responses.GET, f"https://api.github.com/repos/{org}/{repo_name}/commits/abc/check-runs",
                          json={"check_runs": [{"name": "t", "conclusion": "success", "html_url": "x"}]}, status=200)
 
-            mock_gspread['worksheet'].row_values.return_value = ["", "", "GitHub"]
-            mock_gspread['worksheet'].col_values.return_value = ["", "", "testuser"]
+            mock_gspread['worksheet'].get_all_values.return_value = [
+                ["", "", "GitHub", ""],
+                ["", "", "", "ЛР1"],
+                ["", "", "testuser", ""],
+            ]
 
             from main import grade_lab, GradeRequest
             grade_request = GradeRequest(github="testuser")
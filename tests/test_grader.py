@@ -1,4 +1,6 @@
 """Tests for grading orchestrator."""
+import time
+
 import pytest
 from unittest.mock import MagicMock
 
@@ -29,7 +31,7 @@ class TestLabGraderCheckRepository:
         config = {"github-prefix": "lab1", "files": ["main.cpp"]}
         mock_github.check_required_files.return_value = ["main.cpp"]
 
-        result = grader.check_repository("org", "lab1-user", config)
+        result, _ = grader.check_repository("org", "lab1-user", config)
 
         assert result is not None
         assert result.status == GradeStatus.ERROR
@@ -42,34 +44,86 @@ class TestLabGraderCheckRepository:
         mock_github.has_workflows_directory.return_value = True
         mock_github.get_latest_commit.return_value = CommitInfo(sha="abc123", files=[])
 
-        result = grader.check_repository("org", "lab1-user", config)
+        result, commit = grader.check_repository("org", "lab1-user", config)
 
         assert result is None  # No error
+        assert commit.sha == "abc123"
 
     def test_no_workflows(self, grader, mock_github, basic_config):
         """Test error when workflows directory is missing."""
         mock_github.check_required_files.return_value = []
         mock_github.has_workflows_directory.return_value = False
 
-        result = grader.check_repository("org", "lab1-user", basic_config)
+        result, _ = grader.check_repository("org", "lab1-user", basic_config)
 
         assert result is not None
         assert result.status == GradeStatus.ERROR
         assert "workflows" in result.message.lower()
 
+    def test_commit_not_fetched_on_error(self, grader, mock_github, basic_config):
+        """A failed file check returns without fetching the latest commit."""
+        mock_github.check_required_files.return_value = []
+        mock_github.has_workflows_directory.return_value = False
+
+        grader.check_repository("org", "lab1-user", basic_config)
+
+        mock_github.get_latest_commit.assert_not_called()
+
     def test_no_commits(self, grader, mock_github, basic_config):
         """Test error when repository has no commits."""
         mock_github.check_required_files.return_value = []
         mock_github.has_workflows_directory.return_value = True
         mock_github.get_latest_commit.return_value = None
 
-        result = grader.check_repository("org", "lab1-user", basic_config)
+        result, _ = grader.check_repository("org", "lab1-user", basic_config)
 
         assert result is not None
         assert result.status == GradeStatus.ERROR
         assert "коммит" in result.message.lower()
 
 
+class TestLabGraderValidationCache:
+    """Tests for skipping repository checks of an already validated commit."""
+
+    @pytest.fixture
+    def mock_github(self):
+        mock = MagicMock(spec=GitHubClient)
+        mock.check_required_files.return_value = []
+        mock.has_workflows_directory.return_value = True
+        mock.get_latest_commit.return_value = CommitInfo(sha="abc123", files=[])
+        return mock
+
+    def test_same_commit_not_rechecked(self, mock_github):
+        """A second check of the same commit skips file lookups."""
+        config = {"github-prefix": "lab1", "files": ["main.cpp"]}
+
+        assert LabGrader(mock_github).check_repository("org", "lab1-user", config)[0] is None
+        assert LabGrader(mock_github).check_repository("org", "lab1-user", config)[0] is None
+
+        mock_github.check_required_files.assert_called_once()
+        mock_github.has_workflows_directory.assert_called_once()
+
+    def test_new_commit_rechecked(self, mock_github):
+        """A new commit goes through all checks again."""
+        config = {"github-prefix": "lab1", "files": ["main.cpp"]}
+        LabGrader(mock_github).check_repository("org", "lab1-user", config)
+
+        mock_github.get_latest_commit.return_value = CommitInfo(sha="def456", files=[])
+        mock_github.check_required_files.return_value = ["main.cpp"]
+        result, _ = LabGrader(mock_github).check_repository("org", "lab1-user", config)
+
+        assert result.error_code == "MISSING_FILES"
+
+    def test_failed_check_not_cached(self, mock_github):
+        """Commits that failed the checks are checked again."""
+        config = {"github-prefix": "lab1"}
+        mock_github.has_workflows_directory.return_value = False
+        LabGrader(mock_github).check_repository("org", "lab1-user", config)
+        LabGrader(mock_github).check_repository("org", "lab1-user", config)
+
+        assert mock_github.has_workflows_directory.call_count == 2
+
+
 class TestLabGraderCheckForbiddenFiles:
     """Tests for LabGrader.check_forbidden_files."""
 
@@ -93,6 +147,15 @@ class TestLabGraderCheckForbiddenFiles:
 
         assert result is None
 
+    def test_no_patterns_skips_commit_lookup(self, grader, mock_github):
+        """Without forbidden patterns the commit is not fetched."""
+        config = {"github-prefix": "lab1", "files": ["main.cpp"]}
+
+        result = grader.check_forbidden_files("org", "lab1-user", config)
+
+        assert result is None
+        mock_github.get_latest_commit.assert_not_called()
+
     def test_test_main_modified(self, grader, mock_github):
         """Test error when test_main.py is modified."""
         config = {"github-prefix": "lab1", "files": ["test_main.py"]}
@@ -279,6 +342,19 @@ class TestLabGraderGrade:
         assert result.status == GradeStatus.UPDATED
         assert result.result == "v"
 
+    def test_latest_commit_fetched_once(self, grader, mock_github, basic_config):
+        """The commit from the repository check is reused by later steps."""
+        mock_github.check_required_files.return_value = []
+        mock_github.has_workflows_directory.return_value = True
+        mock_github.get_latest_commit.return_value = CommitInfo(sha="abc123", files=[])
+        mock_github.get_check_runs.return_value = [
+            {"name": "test", "conclusion": "success", "html_url": "url1", "completed_at": "2024-01-15T10:00:00Z"},
+        ]
+
+        grader.grade("org", "student1", basic_config)
+
+        mock_github.get_latest_commit.assert_called_once()
+
     def test_stops_on_repository_error(self, grader, mock_github, basic_config):
         """Test that repository errors stop the flow."""
         mock_github.check_required_files.return_value = []
@@ -394,7 +470,7 @@ class TestLabGraderTaskId:
     def test_taskid_valid(self, grader, mock_github):
         """Test success when TASKID matches expected."""
         self._setup_successful_ci(mock_github)
-        mock_github.get_job_logs.return_value = "2024-01-15T10:30:00.000Z TASKID is 5\n"
+        mock_github.get_job_logs_stream.return_value = ["2024-01-15T10:30:00.000Z TASKID is 5"]
         config = {"github-prefix": "lab1", "taskid-max": 20}
 
         result = grader.grade("org", "student1", config, expected_taskid=5)
@@ -405,7 +481,7 @@ class TestLabGraderTaskId:
     def test_taskid_mismatch(self, grader, mock_github):
         """Test error when TASKID doesn't match expected."""
         self._setup_successful_ci(mock_github)
-        mock_github.get_job_logs.return_value = "2024-01-15T10:30:00.000Z TASKID is 10\n"
+        mock_github.get_job_logs_stream.return_value = ["2024-01-15T10:30:00.000Z TASKID is 10"]
         config = {"github-prefix": "lab1", "taskid-max": 20}
 
         result = grader.grade("org", "student1", config, expected_taskid=5)
@@ -417,7 +493,7 @@ class TestLabGraderTaskId:
     def test_taskid_not_found(self, grader, mock_github):
         """Test error when TASKID not found in logs."""
         self._setup_successful_ci(mock_github)
-        mock_github.get_job_logs.return_value = "2024-01-15T10:30:00.000Z No taskid here\n"
+        mock_github.get_job_logs_stream.return_value = ["2024-01-15T10:30:00.000Z No taskid here"]
         config = {"github-prefix": "lab1", "taskid-max": 20}
 
         result = grader.grade("org", "student1", config, expected_taskid=5)
@@ -426,10 +502,72 @@ class TestLabGraderTaskId:
         assert result.result == "?! Wrong TASKID!"
         assert "не найден" in result.message.lower()
 
+    def test_taskid_from_later_job(self, grader, mock_github):
+        """Logs of all successful jobs are checked in order."""
+        self._setup_successful_ci(mock_github)
+        mock_github.get_check_runs.return_value = [
+            {
+                "name": "build",
+                "conclusion": "success",
+                "html_url": "https://github.com/org/repo/actions/runs/1/job/1",
+                "completed_at": "2024-03-14T10:00:00Z"
+            },
+            {
+                "name": "test",
+                "conclusion": "success",
+                "html_url": "https://github.com/org/repo/actions/runs/1/job/2",
+                "completed_at": "2024-03-14T10:00:00Z"
+            },
+        ]
+        logs = {
+            1: ["2024-01-15T10:30:00.000Z No taskid here"],
+            2: ["2024-01-15T10:30:00.000Z TASKID is 5"],
+        }
+        mock_github.get_job_logs_stream.side_effect = lambda org, repo, job_id: logs[job_id]
+        config = {"github-prefix": "lab1", "taskid-max": 20}
+
+        result = grader.grade("org", "student1", config, expected_taskid=5)
+
+        assert result.status == GradeStatus.UPDATED
+        assert mock_github.get_job_logs_stream.call_count == 2
+
+    def test_other_job_logs_not_read_after_match(self, grader, mock_github):
+        """Once a job yields the TASKID, slower jobs stop streaming their logs."""
+        self._setup_successful_ci(mock_github)
+        mock_github.get_check_runs.return_value = [
+            {
+                "name": name,
+                "conclusion": "success",
+                "html_url": f"https://github.com/org/repo/actions/runs/1/job/{job_id}",
+                "completed_at": "2024-03-14T10:00:00Z"
+            }
+            for job_id, name in ((1, "build"), (2, "test"))
+        ]
+        lines_read = []
+
+        def slow_log():
+            for i in range(200):
+                lines_read.append(i)
+                time.sleep(0.005)
+                yield f"2024-01-15T10:30:00.000Z line {i}"
+
+        logs = {1: lambda: ["2024-01-15T10:30:00.000Z TASKID is 5"], 2: slow_log}
+        mock_github.get_job_logs_stream.side_effect = lambda org, repo, job_id: logs[job_id]()
+        config = {"github-prefix": "lab1", "taskid-max": 20}
+
+        result = grader.grade("org", "student1", config, expected_taskid=5)
+
+        assert result.status == GradeStatus.UPDATED
+        # The scan may not even have started; either way reading stops
+        time.sleep(0.05)
+        read_after_grade = len(lines_read)
+        time.sleep(0.1)
+        assert len(lines_read) == read_after_grade < 200
+
     def test_taskid_ignored_when_flag_set(self, grader, mock_github):
         """Test TASKID check skipped when ignore-task-id is True."""
         self._setup_successful_ci(mock_github)
-        mock_github.get_job_logs.return_value = "2024-01-15T10:30:00.000Z No taskid\n"
+        mock_github.get_job_logs_stream.return_value = ["2024-01-15T10:30:00.000Z No taskid"]
         config = {"github-prefix": "lab1", "taskid-max": 20, "ignore-task-id": True}
 
         result = grader.grade("org", "student1", config, expected_taskid=5)
@@ -437,7 +575,7 @@ class TestLabGraderTaskId:
         assert result.status == GradeStatus.UPDATED
         assert result.result == "v"
         # Logs should not be fetched
-        mock_github.get_job_logs.assert_not_called()
+        mock_github.get_job_logs_stream.assert_not_called()
 
     def test_no_expected_taskid_skips_check(self, grader, mock_github):
         """Test TASKID check skipped when expected_taskid is None."""
@@ -449,4 +587,4 @@ class TestLabGraderTaskId:
         assert result.status == GradeStatus.UPDATED
         assert result.result == "v"
         # Logs should not be fetched
-        mock_github.get_job_logs.assert_not_called()
+        mock_github.get_job_logs_stream.assert_not_called()
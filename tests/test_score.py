@@ -56,6 +56,35 @@ class TestExtractScoreFromLogs:
         assert result.found == "8.5"
         assert result.error is None
 
+    def test_extract_score_earlier_pattern_wins_over_earlier_line(self):
+        """Pattern order decides, not the position of the match in the logs."""
+        logs = (
+            "2024-01-15T10:30:00.000Z Score is 3\n"
+            "2024-01-15T10:30:01.000Z Total: 9\n"
+        )
+        patterns = [
+            r'Points\s+(\d+)',
+            r'Total:\s+(\d+)',
+            r'Score\s+is\s+(\d+)',
+        ]
+
+        result = extract_score_from_logs(logs, patterns)
+
+        assert result.found == "9"
+
+    def test_extract_score_pattern_with_backreference(self):
+        """Patterns with backreferences are tried in order like any other."""
+        logs = "2024-01-15T10:30:00.000Z Score is 4\n"
+        patterns = [
+            r'Points\s+(\d+)',
+            r'(Total)\1:\s+(\d+)',
+            r'Score\s+is\s+(\d+)',
+        ]
+
+        result = extract_score_from_logs(logs, patterns)
+
+        assert result.found == "4"
+
     def test_extract_score_multiple_occurrences_same_value(self):
         """Test multiple occurrences of same score value."""
         logs = """2024-01-15T10:30:00.000Z Score is 10.5
@@ -79,6 +108,18 @@ class TestExtractScoreFromLogs:
         assert result.found is None
         assert "несколько разных" in result.error.lower()
 
+    def test_extract_score_same_value_different_separators(self):
+        """Same value written with comma, dot and trailing zero is one score."""
+        logs = """2024-01-15T10:30:00.000Z Score is 10.5
+2024-01-15T10:30:01.000Z Score is 10,5
+2024-01-15T10:30:02.000Z Score is 10.50"""
+        patterns = [r'Score\s+is\s+(\d+(?:[.,]\d+)?)']
+
+        result = extract_score_from_logs(logs, patterns)
+
+        assert result.found == "10.5"
+        assert result.error is None
+
     def test_extract_score_not_found(self):
         """Test error when score not found in logs."""
         logs = "2024-01-15T10:30:00.000Z No score here\n"
@@ -105,6 +146,15 @@ class TestExtractScoreFromLogs:
         assert result.found is None
         assert "не указаны" in result.error.lower()
 
+    def test_extract_score_skips_invalid_pattern(self):
+        """Invalid regex is skipped, the next pattern is still tried."""
+        logs = "2024-01-15T10:30:00.000Z Score is 7\n"
+        patterns = [r'Score\s+(', r'Score\s+is\s+(\d+)']
+
+        result = extract_score_from_logs(logs, patterns)
+
+        assert result.found == "7"
+
 
 class TestScoresEqual:
     """Tests for scores_equal function."""
@@ -129,6 +179,11 @@ class TestScoresEqual:
         assert scores_equal("10.5", "10.6") is False
         assert scores_equal("10", "11") is False
 
+    def test_scores_equal_non_numeric(self):
+        """Non-numeric values fall back to string comparison."""
+        assert scores_equal("abc", "abc") is True
+        assert scores_equal("abc", "10") is False
+
 
 class TestFormatScore:
     """Tests for format_score function."""
@@ -4,6 +4,7 @@ Unit tests for grading/sheets_client.py
 Tests Google Sheets helper functions.
 """
 import pytest
+from datetime import datetime, timedelta, timezone
 from unittest.mock import MagicMock
 import sys
 import os
@@ -12,14 +13,21 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from grading.sheets_client import (
     find_student_row,
+    build_github_index,
+    find_student_row_indexed,
     find_lab_column_by_name,
     calculate_lab_column,
     can_overwrite_cell,
     format_cell_protection_message,
     prepare_grade_update,
+    get_deadline_from_sheet,
+    get_student_order,
+    get_decimal_separator,
+    fetch_sheet_snapshot,
     StudentLocation,
     LabColumn,
     GradeUpdate,
+    SheetSnapshot,
 )
 
 
@@ -71,6 +79,22 @@ class TestFindStudentRow:
         assert row == 6  # 3 + 3
 
 
+class TestGithubIndex:
+    """Tests for build_github_index and find_student_row_indexed."""
+
+    def test_matches_find_student_row(self):
+        """Indexed lookup gives the same rows as find_student_row."""
+        github_values = ["UserOne", "", "user2", "USER2"]
+        index = build_github_index(github_values)
+        for username in ["userone", "USER2", "unknown"]:
+            assert find_student_row_indexed(index, username) == find_student_row(github_values, username)
+
+    def test_custom_start_row(self):
+        """Custom start row offset."""
+        index = build_github_index(["user1", "user2"], start_row=5)
+        assert find_student_row_indexed(index, "user2") == 6
+
+
 class TestFindLabColumnByName:
     """Tests for find_lab_column_by_name function."""
 
@@ -102,6 +126,140 @@ class TestFindLabColumnByName:
         assert col is None
 
 
+class TestSheetSnapshot:
+    """Tests for SheetSnapshot and the helpers reading from it."""
+
+    @pytest.fixture
+    def snapshot(self):
+        return SheetSnapshot([
+            ["", "", "GitHub", "15.03.2025"],
+            ["№", "ФИО", "", "ЛР1"],
+            ["7", "Иванов", "user1"],
+        ])
+
+    def test_fetch_reads_worksheet_once(self):
+        """Snapshot is built from a single get_all_values call."""
+        mock_worksheet = MagicMock()
+        mock_worksheet.get_all_values.return_value = [["a", "b"]]
+
+        snapshot = fetch_sheet_snapshot(mock_worksheet)
+
+        assert snapshot.value(1, 2) == "b"
+        mock_worksheet.get_all_values.assert_called_once_with()
+
+    def test_value_outside_grid(self, snapshot):
+        """Cells outside the fetched grid are empty."""
+        assert snapshot.value(3, 4) == ""
+        assert snapshot.value(10, 1) == ""
+        assert snapshot.value(0, 1) == ""
+
+    def test_row_and_col_values(self, snapshot):
+        """Row and column reads are 1-based."""
+        assert snapshot.row_values(1) == ["", "", "GitHub", "15.03.2025"]
+        assert snapshot.row_values(5) == []
+        assert snapshot.col_values(3) == ["GitHub", "", "user1"]
+        assert snapshot.col_values(4) == ["15.03.2025", "ЛР1", ""]
+
+    def test_github_index(self, snapshot):
+        """GitHub index starts at row 3 and is built once."""
+        index = snapshot.github_index(3)
+        assert index == {"user1": 3}
+        assert snapshot.github_index(3) is index
+
+    def test_find_lab_column(self, snapshot):
+        """Lab column is found in the snapshot without an API call."""
+        assert find_lab_column_by_name(snapshot, "ЛР1") == 4
+        assert find_lab_column_by_name(snapshot, "ЛР9") is None
+
+    def test_student_order(self, snapshot):
+        """Task ID is read from the snapshot."""
+        assert get_student_order(snapshot, 3, 1) == 7
+        assert get_student_order(snapshot, 3, 4) is None
+
+    def test_deadline(self, snapshot):
+        """Deadline is read from the snapshot."""
+        deadline = get_deadline_from_sheet(snapshot, 4)
+        assert (deadline.year, deadline.month, deadline.day) == (2025, 3, 15)
+
+
+class TestGetDeadlineFromSheet:
+    """Tests for deadline parsing in get_deadline_from_sheet."""
+
+    @pytest.mark.parametrize("value, expected", [
+        ("15.03.2025 18:30", datetime(2025, 3, 15, 18, 30)),
+        ("15.03.2025", datetime(2025, 3, 15, 23, 59, 59)),
+        ("5.3.2025", datetime(2025, 3, 5, 23, 59, 59)),
+        ("2025-03-15 18:30:15", datetime(2025, 3, 15, 18, 30, 15)),
+        ("2025-03-15 18:30", datetime(2025, 3, 15, 18, 30)),
+        ("2025-03-15", datetime(2025, 3, 15, 23, 59, 59)),
+        ("2025-03-15T18:30:15", datetime(2025, 3, 15, 18, 30, 15)),
+        ("15.03.2025   18:30", datetime(2025, 3, 15, 18, 30)),
+    ])
+    def test_supported_formats(self, value, expected):
+        """All supported formats parse; date-only means end of day."""
+        snapshot = SheetSnapshot([[value]])
+        assert get_deadline_from_sheet(snapshot, 1) == expected
+
+    @pytest.mark.parametrize("value", [
+        "2025-03-15T18:30",
+        "2025-02-30",
+        "2025-03-15+03:00",
+        "2025-03-15 23.59",
+        "2025-03-15 23:59+03",
+        "2025-03-15 23+19",
+        "2025-W11-6",
+        "31.02.2025",
+        "15.13.2025",
+        "завтра",
+    ])
+    def test_unparseable(self, value):
+        """Unsupported or invalid dates give None."""
+        snapshot = SheetSnapshot([[value]])
+        assert get_deadline_from_sheet(snapshot, 1) is None
+
+    def test_timezone_applied(self):
+        """Timezone string is applied to naive deadlines."""
+        snapshot = SheetSnapshot([["15.03.2025 18:30"]])
+        deadline = get_deadline_from_sheet(snapshot, 1, timezone_str="UTC+3")
+        assert deadline == datetime(2025, 3, 15, 18, 30, tzinfo=timezone(timedelta(hours=3)))
+
+
+class TestGetDecimalSeparator:
+    """Tests for get_decimal_separator function."""
+
+    @staticmethod
+    def _spreadsheet(locale, spreadsheet_id="sheet1"):
+        spreadsheet = MagicMock()
+        spreadsheet.id = spreadsheet_id
+        spreadsheet.fetch_sheet_metadata.return_value = {"properties": {"locale": locale}}
+        return spreadsheet
+
+    def test_comma_locale(self):
+        """Russian locale uses comma."""
+        assert get_decimal_separator(self._spreadsheet("ru_RU")) == ","
+
+    def test_dot_locale(self):
+        """English locale uses dot."""
+        assert get_decimal_separator(self._spreadsheet("en_US")) == "."
+
+    def test_cached_per_spreadsheet(self):
+        """Metadata is fetched once per spreadsheet id."""
+        spreadsheet = self._spreadsheet("ru_RU")
+        assert get_decimal_separator(spreadsheet) == ","
+        assert get_decimal_separator(spreadsheet) == ","
+        spreadsheet.fetch_sheet_metadata.assert_called_once()
+
+        other = self._spreadsheet("en_US", spreadsheet_id="sheet2")
+        assert get_decimal_separator(other) == "."
+
+    def test_failure_not_cached(self):
+        """A failed lookup falls back to dot and is retried next time."""
+        spreadsheet = self._spreadsheet("ru_RU")
+        spreadsheet.fetch_sheet_metadata.side_effect = [Exception("API error"), {"properties": {"locale": "ru_RU"}}]
+        assert get_decimal_separator(spreadsheet) == "."
+        assert get_decimal_separator(spreadsheet) == ","
+
+
 class TestCalculateLabColumn:
     """Tests for calculate_lab_column function."""
 
@@ -165,6 +323,12 @@ class TestCanOverwriteCell:
         assert can_overwrite_cell("some text") is False
         assert can_overwrite_cell("123") is False
 
+    def test_surrounding_whitespace(self):
+        """Whitespace around the value is ignored."""
+        assert can_overwrite_cell("  x ") is True
+        assert can_overwrite_cell(" ?pending") is True
+        assert can_overwrite_cell(" v ") is False
+
 
 class TestFormatCellProtectionMessage:
     """Tests for format_cell_protection_message function."""
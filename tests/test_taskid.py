@@ -11,6 +11,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from grading.taskid import (
     extract_taskid_from_logs,
+    extract_taskid_from_lines,
     calculate_expected_taskid,
     validate_taskid,
     TaskIdResult,
@@ -110,6 +111,56 @@ class TestExtractTaskIdFromLogs:
         assert result.found == 15
 
 
+class TestExtractTaskIdFromLines:
+    """Tests for extract_taskid_from_lines function."""
+
+    def test_matches_full_log_extraction(self):
+        """Line-by-line result equals whole-log result."""
+        logs = """2024-01-15T10:30:00.000Z Starting tests...
+2024-01-15T10:30:01.000Z TASKID is 7
+2024-01-15T10:30:02.000Z Some text TASKID is 99"""
+        result = extract_taskid_from_lines(iter(logs.splitlines()))
+        assert result == extract_taskid_from_logs(logs)
+        assert result.found == 7
+
+    def test_lines_with_newlines(self):
+        """Trailing newlines on lines are accepted."""
+        result = extract_taskid_from_lines(["2024-01-15T10:30:00.000Z TASKID is 3\n"])
+        assert result.found == 3
+
+    def test_different_taskid_later_in_log(self):
+        """A different TASKID after the first one is still an error."""
+        lines = [
+            "2024-01-15T10:30:00.000Z TASKID is 5",
+            "2024-01-15T10:30:01.000Z TASKID is 7",
+        ]
+        result = extract_taskid_from_lines(lines)
+        assert result.found is None
+        assert "несколько" in result.error
+
+    def test_stops_reading_after_mismatch(self):
+        """Lines after the first different TASKID are not consumed."""
+        lines = iter([
+            "2024-01-15T10:30:00.000Z TASKID is 5",
+            "2024-01-15T10:30:01.000Z TASKID is 7",
+            "2024-01-15T10:30:02.000Z rest of the log",
+        ])
+        result = extract_taskid_from_lines(lines)
+        assert "несколько" in result.error
+        assert next(lines) == "2024-01-15T10:30:02.000Z rest of the log"
+
+    def test_empty_lines(self):
+        """Empty stream reports empty logs."""
+        result = extract_taskid_from_lines([])
+        assert result.found is None
+        assert result.error == "Логи пусты"
+
+    def test_no_taskid(self):
+        """No TASKID line reports not found."""
+        result = extract_taskid_from_lines(["2024-01-15T10:30:00.000Z hello"])
+        assert result.error == "TASKID не найден в логах"
+
+
 class TestCalculateExpectedTaskId:
     """Tests for calculate_expected_taskid function."""
 